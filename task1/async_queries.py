@@ -0,0 +1,155 @@
+"""
+Асинхронне виконання запитів на читання з queries.sql (psycopg 3)
+
+Незалежні SELECT з каталогу виконуються одночасно на пулі асинхронних
+з'єднань, а також одним пакетом у pipeline-режимі на одному з'єднанні, коли
+його підтримує libpq. Для порівняння той самий набір запитів виконується
+послідовно, як у queries.py.
+"""
+import asyncio
+import sys
+import time
+from typing import List, Tuple
+from psycopg import AsyncConnection, Pipeline
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+from db import get_connection, get_connection_params, release_connection
+from queries import parse_sql_file
+
+
+DEFAULT_POOL_SIZE = 8
+
+# (опис, кількість рядків, тривалість у секундах)
+QueryTiming = Tuple[str, int, float]
+
+
+def get_conninfo() -> str:
+    """Будує рядок підключення psycopg 3 з тих самих параметрів, що й пул db.py"""
+    params = get_connection_params()
+    params["dbname"] = params.pop("database")
+    return make_conninfo(**params)
+
+
+def load_read_queries(sql_file_path: str = "queries.sql") -> List[Tuple[str, str]]:
+    """Повертає лише запити на читання - їх можна виконувати в будь-якому порядку"""
+    return [(query.description, query.sql) for query in parse_sql_file(sql_file_path)
+            if not query.is_write]
+
+
+def run_sequential(queries: List[Tuple[str, str]]) -> Tuple[float, List[QueryTiming]]:
+    """Виконує запити по черзі на одному з'єднанні psycopg2"""
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    timings: List[QueryTiming] = []
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            for description, query in queries:
+                query_started = time.perf_counter()
+                cursor.execute(query)
+                rows = len(cursor.fetchall())
+                timings.append((description, rows, time.perf_counter() - query_started))
+    finally:
+        release_connection(conn)
+    return time.perf_counter() - started, timings
+
+
+async def run_query(pool: AsyncConnectionPool, description: str, query: str) -> QueryTiming:
+    """Виконує один запит на з'єднанні з асинхронного пулу"""
+    started = time.perf_counter()
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query)
+            rows = len(await cursor.fetchall())
+    return description, rows, time.perf_counter() - started
+
+
+async def run_concurrent(queries: List[Tuple[str, str]],
+                         pool_size: int = DEFAULT_POOL_SIZE) -> Tuple[float, List[QueryTiming]]:
+    """Виконує запити одночасно на пулі з pool_size з'єднань"""
+    async with AsyncConnectionPool(get_conninfo(), min_size=pool_size, max_size=pool_size, open=False) as pool:
+        # Відкриття з'єднань не враховується у часі виконання запитів
+        await pool.wait()
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(run_query(pool, description, query)
+                                         for description, query in queries))
+        return time.perf_counter() - started, list(timings)
+
+
+async def run_pipelined(queries: List[Tuple[str, str]]) -> Tuple[float, List[QueryTiming]]:
+    """
+    Надсилає всі запити одним пакетом у pipeline-режимі на одному з'єднанні
+
+    Сервер виконує запити по черзі, але клієнт не чекає відповіді на кожен
+    перед відправкою наступного, тож мережеві затримки не накопичуються.
+    Час окремого запиту в цьому режимі невідомий, тому у звіті він нульовий.
+    """
+    async with await AsyncConnection.connect(get_conninfo()) as conn:
+        started = time.perf_counter()
+        cursors = []
+        async with conn.pipeline():
+            for _, query in queries:
+                cursor = conn.cursor()
+                await cursor.execute(query)
+                cursors.append(cursor)
+
+        timings: List[QueryTiming] = []
+        for (description, _), cursor in zip(queries, cursors):
+            rows = len(await cursor.fetchall())
+            timings.append((description, rows, 0.0))
+            await cursor.close()
+        return time.perf_counter() - started, timings
+
+
+async def compare_runners(pool_size: int = DEFAULT_POOL_SIZE, sql_file_path: str = "queries.sql") -> None:
+    """Виконує запити на читання трьома способами і виводить час кожного"""
+    queries = load_read_queries(sql_file_path)
+    if not queries:
+        print("Не знайдено запитів для виконання")
+        return
+
+    print(f"Запитів на читання: {len(queries)}")
+    print("=" * 60)
+
+    sequential_time, sequential_timings = run_sequential(queries)
+    concurrent_time, concurrent_timings = await run_concurrent(queries, pool_size)
+
+    print(f"{'Запит':<50} {'рядків':>8} {'послідовно':>12} {'одночасно':>12}")
+    for (description, rows, seq_elapsed), (_, _, conc_elapsed) in zip(sequential_timings, concurrent_timings):
+        print(f"{description[:50]:<50} {rows:>8} {seq_elapsed * 1000:>10.1f}мс {conc_elapsed * 1000:>10.1f}мс")
+
+    print("-" * 60)
+    print(f"Послідовно (psycopg2, одне з'єднання):    {sequential_time * 1000:>10.1f} мс")
+    print(f"Одночасно (asyncio, пул з {pool_size} з'єднань): {concurrent_time * 1000:>10.1f} мс "
+          f"(x{sequential_time / concurrent_time:.2f})")
+
+    if Pipeline.is_supported():
+        pipeline_time, _ = await run_pipelined(queries)
+        print(f"Pipeline (одне з'єднання):                {pipeline_time * 1000:>10.1f} мс "
+              f"(x{sequential_time / pipeline_time:.2f})")
+    else:
+        print("Pipeline-режим не підтримується цією версією libpq (потрібна 14+)")
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    try:
+        pool_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_POOL_SIZE
+    except ValueError:
+        print("Використання: python async_queries.py [розмір_пулу]")
+        return
+
+    # Асинхронний psycopg не працює з ProactorEventLoop, стандартним для Windows
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    try:
+        asyncio.run(compare_runners(pool_size))
+    except Exception as e:
+        print(f"Помилка: {e}")
+
+
+if __name__ == "__main__":
+    main()
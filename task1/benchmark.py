@@ -0,0 +1,501 @@
+"""
+Бенчмарк SQL запитів з queries.sql на різних обсягах даних
+"""
+import json
+import math
+import random
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from psycopg2.extensions import connection
+from db import get_connection, release_connection
+from queries import DEFAULT_ITERSIZE, idle_users_sql, parse_sql_file
+from create_tables import DEFAULT_TASK_PARTITIONS
+from seed import DEFAULT_SEED, parallel_seed
+
+
+# Обсяги даних у кількості завдань; на кожного користувача припадає в середньому 10 завдань
+DEFAULT_SCALES = [1_000, 100_000, 10_000_000]
+TASKS_PER_USER = 10
+DEFAULT_REPEATS = 20
+
+# Початкова форма запиту 4 для порівняння з NOT EXISTS
+LEGACY_IDLE_USERS_SQL = """SELECT u.id, u.fullname, u.email
+FROM users u
+WHERE u.id NOT IN (SELECT DISTINCT user_id FROM tasks WHERE user_id IS NOT NULL)
+ORDER BY u.id"""
+DEFAULT_IDLE_USERS = 1_000_000
+# Завдання розподіляються між користувачами випадково, тож при 2 завданнях
+# на користувача приблизно e^-2 ≈ 13.5% користувачів залишаються без завдань
+IDLE_TASKS_PER_USER = 2
+IDLE_STATEMENT_TIMEOUT_MS = 300_000
+
+# Порівняння таблиці tasks з розділами за хешем user_id і без них
+DEFAULT_PARTITION_USERS = 1_000_000
+PARTITION_SAMPLE_USERS = 200
+PARTITION_DELETE_USERS = 50
+BENCH_PLAIN_TABLE = "bench_tasks_plain"
+BENCH_HASH_TABLE = "bench_tasks_hash"
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Обчислює перцентиль з лінійною інтерполяцією між сусідніми значеннями"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize_timings(timings_ms: List[float]) -> Dict[str, float]:
+    """Повертає p50/p95/p99, мінімум, максимум та середнє для списку затримок у мс"""
+    return {
+        "p50_ms": round(percentile(timings_ms, 50), 3),
+        "p95_ms": round(percentile(timings_ms, 95), 3),
+        "p99_ms": round(percentile(timings_ms, 99), 3),
+        "min_ms": round(min(timings_ms), 3) if timings_ms else 0.0,
+        "max_ms": round(max(timings_ms), 3) if timings_ms else 0.0,
+        "mean_ms": round(sum(timings_ms) / len(timings_ms), 3) if timings_ms else 0.0,
+    }
+
+
+def benchmark_query(conn: connection, description: str, query: str, repeats: int,
+                    is_write: bool = False) -> Dict[str, Any]:
+    """
+    Виконує запит repeats разів і збирає статистику затримок та план виконання
+
+    Запити на зміну даних відкочуються після кожного виконання, тож усі
+    прогони працюють з однаковим набором даних. Результати читання
+    вибираються через серверний курсор порціями і не зберігаються, а кількість
+    рядків рахується окремим COUNT(*) поза вимірюваними прогонами.
+
+    Args:
+        conn: З'єднання з базою даних
+        description: Опис запиту з queries.sql
+        query: SQL запит
+        repeats: Кількість виконань
+        is_write: Чи змінює запит дані (CatalogQuery.is_write)
+
+    Returns:
+        Словник з результатами для JSON звіту
+    """
+    timings_ms: List[float] = []
+    rows = 0
+
+    with conn.cursor() as cursor:
+        if not is_write:
+            cursor.execute(f"SELECT count(*) FROM ({query}) AS q")
+            rows = cursor.fetchone()[0]
+            conn.rollback()
+
+        for repeat in range(repeats):
+            started = time.perf_counter()
+            if is_write:
+                cursor.execute(query)
+                rows = cursor.rowcount
+            else:
+                # Серверний курсор закривається разом із транзакцією при rollback
+                with conn.cursor(name=f"benchmark_cursor_{repeat}") as named_cursor:
+                    named_cursor.execute(query)
+                    while named_cursor.fetchmany(DEFAULT_ITERSIZE):
+                        pass
+            timings_ms.append((time.perf_counter() - started) * 1000)
+            conn.rollback()
+
+        # EXPLAIN ANALYZE справді виконує запит, тому для змін теж відкочуємо
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")
+        plan = cursor.fetchone()[0]
+        conn.rollback()
+
+    result: Dict[str, Any] = {
+        "description": description,
+        "query": query,
+        "type": "write" if is_write else "read",
+        "repeats": repeats,
+        "rows": rows,
+    }
+    result.update(summarize_timings(timings_ms))
+    result["plan"] = plan
+    return result
+
+
+def prepare_scale(num_tasks: int, num_users: Optional[int] = None) -> Optional[int]:
+    """Заповнює базу для заданого обсягу та оновлює статистику, повертає кількість користувачів"""
+    num_users = num_users or max(10, num_tasks // TASKS_PER_USER)
+    if not parallel_seed(num_users, num_tasks):
+        print(f"Не вдалося заповнити базу для обсягу {num_tasks} завдань")
+        return None
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return None
+    try:
+        # VACUUM не може виконуватись у транзакції
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("VACUUM ANALYZE users;")
+            cursor.execute("VACUUM ANALYZE tasks;")
+    finally:
+        release_connection(conn)
+    return num_users
+
+
+def run_benchmark(scales: List[int], repeats: int = DEFAULT_REPEATS,
+                  output_path: Optional[str] = None, sql_file_path: str = "queries.sql") -> Optional[str]:
+    """
+    Запускає бенчмарк усіх запитів на кожному обсязі даних
+
+    Args:
+        scales: Обсяги даних у кількості завдань
+        repeats: Кількість виконань кожного запиту
+        output_path: Файл для JSON звіту (за замовчуванням benchmark_<час>.json)
+        sql_file_path: Шлях до файлу з запитами
+
+    Returns:
+        Шлях до збереженого звіту або None у випадку помилки
+    """
+    queries = parse_sql_file(sql_file_path)
+    if not queries:
+        print("Не знайдено запитів для виконання")
+        return None
+
+    started_at = datetime.now()
+    output_path = output_path or f"benchmark_{started_at:%Y%m%d_%H%M%S}.json"
+    report: Dict[str, Any] = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "repeats": repeats,
+        "scales": [],
+    }
+
+    for num_tasks in scales:
+        print(f"\n{'='*60}")
+        print(f"Обсяг: {num_tasks} завдань")
+        print(f"{'='*60}")
+        num_users = prepare_scale(num_tasks)
+        if num_users is None:
+            return None
+
+        conn = get_connection()
+        if conn is None:
+            print("Не вдалося підключитися до бази даних")
+            return None
+
+        scale_report: Dict[str, Any] = {"tasks": num_tasks, "users": num_users, "queries": []}
+        try:
+            for query in queries:
+                description = query.description
+                try:
+                    result = benchmark_query(conn, description, query.sql, repeats, query.is_write)
+                except Exception as e:
+                    conn.rollback()
+                    print(f"{description}: помилка {e}")
+                    scale_report["queries"].append({"description": description, "query": query.sql,
+                                                    "error": str(e)})
+                    continue
+                scale_report["queries"].append(result)
+                print(f"{description}: p50={result['p50_ms']} мс  p95={result['p95_ms']} мс  "
+                      f"p99={result['p99_ms']} мс  рядків={result['rows']}")
+        finally:
+            release_connection(conn)
+
+        report["scales"].append(scale_report)
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nЗвіт збережено у {output_path}")
+    return output_path
+
+
+def benchmark_idle_users(num_users: int = DEFAULT_IDLE_USERS, repeats: int = 5,
+                         output_path: Optional[str] = None,
+                         sql_file_path: str = "queries.sql") -> Optional[str]:
+    """
+    Порівнює NOT IN та NOT EXISTS для звіту "користувачі без завдань"
+
+    Форма NOT IN на великих даних може виконуватись дуже довго, тому кожне
+    виконання обмежене IDLE_STATEMENT_TIMEOUT_MS і перевищення фіксується у звіті.
+
+    Args:
+        num_users: Кількість користувачів
+        repeats: Кількість виконань кожної форми
+        output_path: Файл для JSON звіту
+        sql_file_path: Шлях до файлу з запитами (форма NOT EXISTS - запит 4)
+
+    Returns:
+        Шлях до збереженого звіту або None у випадку помилки
+    """
+    idle_users_query = idle_users_sql(sql_file_path)
+    if idle_users_query is None:
+        return None
+
+    started_at = datetime.now()
+    output_path = output_path or f"benchmark_idle_users_{started_at:%Y%m%d_%H%M%S}.json"
+    num_tasks = num_users * IDLE_TASKS_PER_USER
+    if prepare_scale(num_tasks, num_users) is None:
+        return None
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return None
+
+    report: Dict[str, Any] = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "users": num_users,
+        "tasks": num_tasks,
+        "statement_timeout_ms": IDLE_STATEMENT_TIMEOUT_MS,
+        "variants": [],
+    }
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SET statement_timeout = {IDLE_STATEMENT_TIMEOUT_MS};")
+        conn.commit()
+
+        for description, query in [("NOT IN (поточна форма)", LEGACY_IDLE_USERS_SQL),
+                                   ("NOT EXISTS (anti-join)", idle_users_query)]:
+            try:
+                result = benchmark_query(conn, description, query, repeats)
+                print(f"{description}: p50={result['p50_ms']} мс  p95={result['p95_ms']} мс  "
+                      f"рядків={result['rows']}")
+            except Exception as e:
+                conn.rollback()
+                result = {"description": description, "query": query, "error": str(e)}
+                print(f"{description}: помилка {e}")
+            report["variants"].append(result)
+    finally:
+        release_connection(conn, close=True)
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nЗвіт збережено у {output_path}")
+    return output_path
+
+
+def create_partition_bench_tables(cursor: Any, partitions: int) -> None:
+    """
+    Створює копії tasks без розділів і з розділами за хешем user_id
+
+    Обидві копії мають однаковий індекс (user_id, id) та зовнішній ключ на
+    users з ON DELETE CASCADE, тож відрізняються лише розбиттям на розділи.
+    """
+    for table in (BENCH_PLAIN_TABLE, BENCH_HASH_TABLE):
+        cursor.execute(f"DROP TABLE IF EXISTS {table};")
+
+    columns = """
+        id INTEGER NOT NULL,
+        title VARCHAR(100) NOT NULL,
+        description TEXT,
+        status_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE
+    """
+    cursor.execute(f"CREATE TABLE {BENCH_PLAIN_TABLE} ({columns}, PRIMARY KEY (id));")
+    cursor.execute(f"CREATE TABLE {BENCH_HASH_TABLE} ({columns}, PRIMARY KEY (id, user_id)) "
+                   f"PARTITION BY HASH (user_id);")
+    for remainder in range(partitions):
+        cursor.execute(f"CREATE TABLE {BENCH_HASH_TABLE}_p{remainder} PARTITION OF {BENCH_HASH_TABLE} "
+                       f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder});")
+
+    for table in (BENCH_PLAIN_TABLE, BENCH_HASH_TABLE):
+        cursor.execute(f"""
+            INSERT INTO {table} (id, title, description, status_id, user_id)
+            SELECT id, title, description, status_id, user_id FROM tasks;
+        """)
+        cursor.execute(f"CREATE INDEX {table}_user_id_id ON {table} (user_id, id);")
+
+
+def cascade_trigger_ms(plan: Any, table: str) -> float:
+    """Час тригера зовнішнього ключа table -> users з EXPLAIN ANALYZE видалення користувачів"""
+    constraint = f"{table}_user_id_fkey"
+    triggers = plan[0].get("Triggers", [])
+    return round(sum(trigger.get("Time", 0.0) for trigger in triggers
+                     if trigger.get("Constraint Name") == constraint), 3)
+
+
+def benchmark_partitioning(num_users: int = DEFAULT_PARTITION_USERS, partitions: int = DEFAULT_TASK_PARTITIONS,
+                           repeats: int = 5, output_path: Optional[str] = None) -> Optional[str]:
+    """
+    Порівнює пошук завдань користувача та каскадне видалення користувачів
+    для таблиці завдань без розділів і з розділами за хешем user_id
+
+    Копії таблиці створюються з поточних даних tasks і видаляються після
+    вимірювань. Каскадні видалення виконуються у транзакції, що відкочується.
+
+    Args:
+        num_users: Кількість користувачів (завдань у TASKS_PER_USER разів більше)
+        partitions: Кількість розділів
+        repeats: Кількість прогонів по вибірці користувачів
+        output_path: Файл для JSON звіту
+
+    Returns:
+        Шлях до збереженого звіту або None у випадку помилки
+    """
+    started_at = datetime.now()
+    output_path = output_path or f"benchmark_partitioning_{started_at:%Y%m%d_%H%M%S}.json"
+    num_tasks = num_users * TASKS_PER_USER
+    if prepare_scale(num_tasks, num_users) is None:
+        return None
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return None
+
+    report: Dict[str, Any] = {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "users": num_users,
+        "tasks": num_tasks,
+        "partitions": partitions,
+        "variants": [],
+    }
+    rng = random.Random(DEFAULT_SEED)
+    try:
+        print(f"Створення копій tasks ({partitions} розділів)...")
+        with conn.cursor() as cursor:
+            create_partition_bench_tables(cursor, partitions)
+            cursor.execute("SELECT min(id), max(id) FROM users;")
+            min_user_id, max_user_id = cursor.fetchone()
+        conn.commit()
+
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for table in (BENCH_PLAIN_TABLE, BENCH_HASH_TABLE):
+                cursor.execute(f"VACUUM ANALYZE {table};")
+        conn.autocommit = False
+
+        lookup_users = [rng.randint(min_user_id, max_user_id) for _ in range(PARTITION_SAMPLE_USERS)]
+        delete_users = rng.sample(range(min_user_id, max_user_id + 1),
+                                  min(PARTITION_DELETE_USERS, max_user_id - min_user_id + 1))
+
+        for description, table in [("Без розділів", BENCH_PLAIN_TABLE),
+                                   (f"HASH (user_id), {partitions} розділів", BENCH_HASH_TABLE)]:
+            lookup_ms: List[float] = []
+            with conn.cursor() as cursor:
+                for _ in range(repeats):
+                    for user_id in lookup_users:
+                        started = time.perf_counter()
+                        cursor.execute(f"SELECT id, title, status_id FROM {table} "
+                                       f"WHERE user_id = %s ORDER BY id;", (user_id,))
+                        cursor.fetchall()
+                        lookup_ms.append((time.perf_counter() - started) * 1000)
+                conn.rollback()
+
+                # Каскад спрацьовує в обидві копії та в tasks; враховуємо лише тригер цієї копії
+                cascade_ms: List[float] = []
+                for _ in range(repeats):
+                    cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) DELETE FROM users WHERE id = ANY(%s);",
+                                   (delete_users,))
+                    cascade_ms.append(cascade_trigger_ms(cursor.fetchone()[0], table))
+                    conn.rollback()
+
+            result: Dict[str, Any] = {"description": description, "table": table,
+                                      "lookup": summarize_timings(lookup_ms),
+                                      "cascade_delete": summarize_timings(cascade_ms),
+                                      "deleted_users": len(delete_users)}
+            report["variants"].append(result)
+            print(f"{description}: пошук за user_id p50={result['lookup']['p50_ms']} мс "
+                  f"p95={result['lookup']['p95_ms']} мс; каскадне видалення {len(delete_users)} "
+                  f"користувачів p50={result['cascade_delete']['p50_ms']} мс")
+    except Exception as e:
+        conn.rollback()
+        print(f"Помилка під час бенчмарку: {e}")
+        return None
+    finally:
+        conn.rollback()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for table in (BENCH_PLAIN_TABLE, BENCH_HASH_TABLE):
+                cursor.execute(f"DROP TABLE IF EXISTS {table};")
+        release_connection(conn)
+
+    with open(output_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nЗвіт збережено у {output_path}")
+    return output_path
+
+
+def compare_results(baseline_path: str, current_path: str, threshold: float = 1.2) -> bool:
+    """
+    Порівнює два звіти бенчмарку за p95 і виводить регресії
+
+    Args:
+        baseline_path: Попередній звіт
+        current_path: Новий звіт
+        threshold: У скільки разів має зрости p95, щоб вважатися регресією
+
+    Returns:
+        True якщо регресій не виявлено
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(current_path, 'r', encoding='utf-8') as file:
+        current = json.load(file)
+
+    baseline_p95 = {
+        (scale["tasks"], item["description"]): item["p95_ms"]
+        for scale in baseline["scales"] for item in scale["queries"] if "p95_ms" in item
+    }
+
+    regressions = 0
+    for scale in current["scales"]:
+        for item in scale["queries"]:
+            key = (scale["tasks"], item["description"])
+            if key not in baseline_p95 or "p95_ms" not in item:
+                continue
+            before, after = baseline_p95[key], item["p95_ms"]
+            ratio = after / before if before else math.inf
+            marker = "РЕГРЕСІЯ" if ratio >= threshold else ""
+            regressions += 1 if marker else 0
+            print(f"[{scale['tasks']:>10}] {item['description'][:50]:<50} "
+                  f"{before:>10.3f} -> {after:>10.3f} мс  x{ratio:.2f} {marker}")
+
+    print(f"\nРегресій: {regressions}")
+    return regressions == 0
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    import sys
+
+    args = sys.argv[1:]
+    if len(args) == 3 and args[0] == "compare":
+        compare_results(args[1], args[2])
+        return
+    if args and args[0] == "idle-users":
+        try:
+            num_users = int(args[1]) if len(args) > 1 else DEFAULT_IDLE_USERS
+        except ValueError:
+            print("Помилка: Кількість користувачів має бути цілим числом")
+            return
+        benchmark_idle_users(num_users)
+        return
+    if args and args[0] == "partitioning":
+        try:
+            num_users = int(args[1]) if len(args) > 1 else DEFAULT_PARTITION_USERS
+            partitions = int(args[2]) if len(args) > 2 else DEFAULT_TASK_PARTITIONS
+        except ValueError:
+            print("Помилка: Кількість користувачів і розділів має бути цілим числом")
+            return
+        benchmark_partitioning(num_users, partitions)
+        return
+
+    try:
+        repeats = int(args[0]) if args else DEFAULT_REPEATS
+        scales = [int(arg) for arg in args[1:]] or DEFAULT_SCALES
+    except ValueError:
+        print("Використання:")
+        print("  python benchmark.py [повтори] [обсяг ...]     - бенчмарк на обсягах (кількість завдань)")
+        print("  python benchmark.py compare <старий> <новий>  - порівняти два звіти")
+        print("  python benchmark.py idle-users [користувачі]  - NOT IN проти NOT EXISTS для запиту 4")
+        print("  python benchmark.py partitioning [користувачі] [розділи] - tasks з розділами за user_id і без")
+        return
+
+    run_benchmark(scales, repeats)
+
+
+if __name__ == "__main__":
+    main()
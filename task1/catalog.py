@@ -0,0 +1,160 @@
+"""
+Скомпільований каталог запитів з queries.sql
+
+Файл розбирається один раз: результат зберігається в пам'яті процесу та на
+диску поруч із файлом (queries.sql.cache.json). Кеш перевіряється за часом
+зміни та розміром файлу, а якщо вони змінились - за SHA-256 вмісту, тож
+простий touch не змушує розбирати файл наново. Кожен запит одразу
+класифікується як читання або зміна даних.
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+CACHE_SUFFIX = ".cache.json"
+# Версія формату кешу; змінюється разом з логікою розбору та класифікації
+CACHE_VERSION = 2
+
+WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'MERGE', 'TRUNCATE')
+# Рядкові літерали ('...', $тег$...$тег$) та коментарі; розбираються одним
+# проходом зліва направо, тож '--' у рядку чи лапка в коментарі не збивають розбір
+_LITERALS_AND_COMMENTS = re.compile(r"'(?:[^']|'')*'|\$(\w*)\$.*?\$\1\$|--[^\n]*|/\*.*?\*/", re.DOTALL)
+# Зміна даних усередині CTE: ціль може мати схему, лапки та псевдонім
+# (UPDATE public.tasks t SET ...); FOR UPDATE у SELECT - це блокування, а не зміна
+_WRITE_IN_CTE = re.compile(r'(?<!FOR )\b(INSERT INTO|UPDATE|DELETE FROM|MERGE INTO) (ONLY )?[\w."]+')
+
+
+class CatalogQuery(NamedTuple):
+    """Запит каталогу"""
+    number: int
+    description: str
+    sql: str
+    is_write: bool
+
+
+# Шлях до файлу -> ((час зміни, розмір), запити)
+_memory_cache: Dict[str, Tuple[Tuple[int, int], List[CatalogQuery]]] = {}
+
+
+@lru_cache(maxsize=256)
+def is_write_query(sql: str) -> bool:
+    """
+    Визначає, чи змінює запит дані
+
+    Враховує коментарі перед запитом та CTE з INSERT/UPDATE/DELETE
+    (WITH ... UPDATE ... RETURNING), які не починаються з ключового слова зміни.
+    Ключові слова всередині рядкових літералів і коментарів ігноруються.
+    """
+    statement = ' '.join(_LITERALS_AND_COMMENTS.sub(' ', sql).upper().split())
+    if statement.startswith(WRITE_KEYWORDS):
+        return True
+    return statement.startswith('WITH') and _WRITE_IN_CTE.search(statement) is not None
+
+
+def parse_sql(content: str) -> List[CatalogQuery]:
+    """Розбирає вміст SQL файлу на пронумеровані запити з описами"""
+    queries: List[CatalogQuery] = []
+
+    # Блоки починаються з коментарів, що містять номери завдань
+    blocks = re.split(r'-- \d+\.', content)
+
+    for i, block in enumerate(blocks):
+        if i == 0:  # Пропускаємо заголовок файлу
+            continue
+
+        lines = block.strip().split('\n')
+        if not lines:
+            continue
+
+        # Перший рядок - опис завдання, решта - SQL запит
+        description = f"{i}. {lines[0].strip()}"
+        sql_lines = [line for line in lines[1:] if line.strip() and not line.strip().startswith('--')]
+
+        if sql_lines:
+            sql_query = '\n'.join(sql_lines).strip()
+            if sql_query.endswith(';'):
+                sql_query = sql_query[:-1]  # Видаляємо крапку з комою
+            queries.append(CatalogQuery(len(queries) + 1, description, sql_query, is_write_query(sql_query)))
+
+    return queries
+
+
+def cache_path(file_path: str) -> str:
+    """Шлях до файлу дискового кешу для SQL файлу"""
+    return file_path + CACHE_SUFFIX
+
+
+def read_disk_cache(file_path: str) -> Optional[Dict[str, Any]]:
+    """Читає дисковий кеш; пошкоджений або застарілий формат ігнорується"""
+    try:
+        with open(cache_path(file_path), 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return cache if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION else None
+
+
+def write_disk_cache(file_path: str, stamp: Tuple[int, int], digest: str, queries: List[CatalogQuery]) -> None:
+    """Атомарно записує дисковий кеш; якщо каталог недоступний для запису, кеш лише в пам'яті"""
+    cache = {
+        "version": CACHE_VERSION,
+        "mtime_ns": stamp[0],
+        "size": stamp[1],
+        "sha256": digest,
+        "queries": [list(query) for query in queries],
+    }
+    temp_path = f"{cache_path(file_path)}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(cache, file, ensure_ascii=False)
+        os.replace(temp_path, cache_path(file_path))
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_catalog(file_path: str = "queries.sql") -> List[CatalogQuery]:
+    """
+    Повертає розібрані запити каталогу, за можливості з кешу
+
+    Args:
+        file_path: Шлях до SQL файлу
+
+    Returns:
+        Список запитів (порожній, якщо файлу немає)
+    """
+    path = os.path.abspath(file_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return []
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _memory_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    disk_cache = read_disk_cache(path)
+    if disk_cache and (disk_cache["mtime_ns"], disk_cache["size"]) == stamp:
+        queries = [CatalogQuery(*query) for query in disk_cache["queries"]]
+        _memory_cache[path] = (stamp, queries)
+        return queries
+
+    with open(path, 'rb') as file:
+        raw = file.read()
+    digest = hashlib.sha256(raw).hexdigest()
+
+    if disk_cache and disk_cache["sha256"] == digest:
+        # Змінився лише час зміни файлу, вміст той самий
+        queries = [CatalogQuery(*query) for query in disk_cache["queries"]]
+    else:
+        queries = parse_sql(raw.decode('utf-8'))
+    write_disk_cache(path, stamp, digest, queries)
+    _memory_cache[path] = (stamp, queries)
+    return queries
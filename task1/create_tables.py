@@ -1,29 +1,426 @@
 """
 Скрипт для створення таблиць бази даних
 """
-import psycopg2
-from typing import Optional
-from psycopg2.extensions import connection
+from typing import Any, List, Optional, Set, Tuple
+from psycopg2.extensions import cursor as Cursor
+from db import get_connection, release_connection
+from queries import parse_sql_file
 
 
-def create_connection() -> Optional[connection]:
-    """Створює з'єднання з базою даних PostgreSQL"""
+# Індекси для зовнішніх ключів tasks: без них кожне каскадне видалення користувача
+# та кожен запит за user_id/status_id перетворюється на повне сканування tasks.
+# Друга колонка id дає keyset-пагінації (pagination.py) готовий порядок у межах
+# користувача чи статусу, тож сторінка читає лише limit рядків індексу
+FOREIGN_KEY_INDEXES: List[str] = [
+    "CREATE INDEX IF NOT EXISTS idx_tasks_user_id_id ON tasks (user_id, id);",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_status_id_id ON tasks (status_id, id);",
+    # Одноколонкові індекси попередньої схеми повністю покриваються новими
+    "DROP INDEX IF EXISTS idx_tasks_user_id;",
+    "DROP INDEX IF EXISTS idx_tasks_status_id;",
+]
+
+# Частковий індекс незавершених завдань. Предикат індексу може містити лише
+# константи, тому ID статусу 'completed' підставляється під час створення
+OPEN_TASKS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_tasks_open ON tasks (status_id, user_id)
+WHERE status_id <> {completed_id};
+"""
+
+# Триграмний індекс обслуговує LIKE '%...%' (запити 8 та 11), а не лише пошук за префіксом
+EMAIL_TRGM_INDEX = "CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);"
+# Якщо розширення pg_trgm недоступне, text_pattern_ops прискорює хоча б LIKE 'префікс%'
+EMAIL_PATTERN_INDEX = "CREATE INDEX IF NOT EXISTS idx_users_email_pattern ON users (email text_pattern_ops);"
+
+
+# Тригер сповіщає кеш статусів (status_cache.py) про будь-яку зміну таблиці status
+STATUS_NOTIFY_TRIGGER = """
+CREATE OR REPLACE FUNCTION notify_status_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('status_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER status_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON status
+FOR EACH STATEMENT EXECUTE FUNCTION notify_status_changed();
+"""
+
+
+# Повнотекстовий пошук за назвою та описом завдання. Конфігурація 'simple' не
+# виконує стемінгу, але працює для будь-якої мови, зокрема української, для якої
+# PostgreSQL не має вбудованого словника. Збіги в назві важать більше, ніж в описі
+TASKS_SEARCH_COLUMN = """
+ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+) STORED;
+"""
+TASKS_SEARCH_INDEX = "CREATE INDEX IF NOT EXISTS idx_tasks_search ON tasks USING gin (search_vector);"
+
+# Варіант tasks, розбитий на розділи за хешем user_id. Завдання одного користувача
+# лежать в одному розділі, тож запити за user_id та каскадне видалення користувача
+# торкаються лише його розділу, а VACUUM і перебудова індексів працюють з
+# невеликими таблицями. Ключ розділу має входити до первинного ключа, тому ключ
+# складений (id, user_id); пошук лише за id (запити 3, 7) перевіряє індекс
+# кожного розділу
+DEFAULT_TASK_PARTITIONS = 16
+
+PARTITIONED_TASKS_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER NOT NULL DEFAULT nextval('tasks_id_seq'),
+    title VARCHAR(100) NOT NULL,
+    description TEXT,
+    status_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED,
+    PRIMARY KEY (id, user_id),
+    FOREIGN KEY (status_id) REFERENCES status(id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+) PARTITION BY HASH (user_id);
+"""
+
+TASK_PARTITION = """
+CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table}
+FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder});
+"""
+
+
+def partitioned_tasks_ddl(table: str, partitions: int, partition_prefix: Optional[str] = None) -> List[str]:
+    """
+    Повертає SQL для створення розбитої за хешем user_id таблиці завдань
+
+    Args:
+        table: Назва батьківської таблиці
+        partitions: Кількість розділів
+        partition_prefix: Префікс назв розділів (за замовчуванням '<table>_p')
+    """
+    prefix = partition_prefix or f"{table}_p"
+    statements = ["CREATE SEQUENCE IF NOT EXISTS tasks_id_seq AS integer;",
+                  PARTITIONED_TASKS_TABLE.format(table=table)]
+    statements += [TASK_PARTITION.format(partition=f"{prefix}{remainder}", table=table,
+                                         modulus=partitions, remainder=remainder)
+                   for remainder in range(partitions)]
+    return statements
+
+
+def get_table_kind(cursor: Cursor, table: str) -> Optional[str]:
+    """Повертає 'r' для звичайної таблиці, 'p' для розбитої на розділи, None якщо таблиці немає"""
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s);", (table,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+# Лічильники завдань за статусами та користувачами, які підтримуються тригерами.
+# Дашборди читають O(статуси + користувачі) рядків замість агрегації всієї tasks.
+# Тригери не оновлюють спільні рядки підсумків, а лише додають рядки-зміни
+# (+n/-n) у task_count_deltas, тож паралельні записи в tasks не блокують один
+# одного. Коли незгорнутих змін стає більше за TASK_COUNTER_COMPACT_THRESHOLD,
+# тригер згортає їх у підсумки; одночасно згортає лише одна транзакція, решта
+# не чекає на неї. Подання status_task_totals та user_task_totals додають до
+# підсумків ще не згорнуті зміни, тож читають O(статуси + користувачі + поріг) рядків.
+# Для user_task_counts немає зовнішнього ключа: при видаленні користувача
+# каскад видаляє його завдання, а згортання прибирає нульові підсумки
+TASK_COUNTER_COMPACT_THRESHOLD = 10_000
+
+CREATE_TASK_COUNTERS = """
+CREATE TABLE IF NOT EXISTS status_task_counts (
+    status_id INTEGER PRIMARY KEY REFERENCES status(id) ON DELETE CASCADE,
+    task_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS user_task_counts (
+    user_id INTEGER PRIMARY KEY,
+    task_count BIGINT NOT NULL DEFAULT 0
+);
+
+-- Рядок-зміна стосується або статусу, або користувача
+CREATE TABLE IF NOT EXISTS task_count_deltas (
+    id BIGSERIAL,
+    status_id INTEGER,
+    user_id INTEGER,
+    task_count BIGINT NOT NULL
+);
+
+-- Номер останньої зміни, врахованої при згортанні
+CREATE TABLE IF NOT EXISTS task_count_compaction (
+    singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+    compacted_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO task_count_compaction DEFAULT VALUES ON CONFLICT DO NOTHING;
+
+-- Проміжна схема, де рядки-зміни зберігались у самих таблицях лічильників
+DROP INDEX IF EXISTS idx_status_task_counts_status_id;
+DROP INDEX IF EXISTS idx_user_task_counts_user_id;
+
+CREATE OR REPLACE VIEW status_task_totals AS
+SELECT status_id, SUM(task_count) AS task_count FROM (
+    SELECT status_id, task_count FROM status_task_counts
+    UNION ALL
+    SELECT status_id, task_count FROM task_count_deltas WHERE status_id IS NOT NULL
+) counts
+GROUP BY status_id;
+
+CREATE OR REPLACE VIEW user_task_totals AS
+SELECT user_id, SUM(task_count) AS task_count FROM (
+    SELECT user_id, task_count FROM user_task_counts
+    UNION ALL
+    SELECT user_id, task_count FROM task_count_deltas WHERE user_id IS NOT NULL
+) counts
+GROUP BY user_id;
+"""
+
+# Згортання рядків-змін у підсумки. DELETE бачить лише закомічені та власні
+# зміни, тож зміни паралельних транзакцій залишаються до наступного згортання.
+# Рекомендаційне блокування допускає лише одне згортання одночасно: тригери
+# пропускають згортання, якщо його вже виконує інша транзакція, а ручний
+# виклик (wait => true) чекає на неї
+COMPACT_TASK_COUNTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION compact_task_counts(wait BOOLEAN DEFAULT true) RETURNS BIGINT AS $$
+DECLARE
+    last_delta BIGINT;
+    folded BIGINT;
+    emptied_users INTEGER[];
+BEGIN
+    SELECT last_value INTO last_delta FROM task_count_deltas_id_seq;
+    IF NOT wait AND last_delta - (SELECT compacted_through FROM task_count_compaction) < {threshold} THEN
+        RETURN 0;
+    END IF;
+
+    IF wait THEN
+        PERFORM pg_advisory_xact_lock(hashtext('task_count_deltas'));
+    ELSIF NOT pg_try_advisory_xact_lock(hashtext('task_count_deltas')) THEN
+        RETURN 0;
+    END IF;
+
+    WITH removed AS (
+        DELETE FROM task_count_deltas RETURNING status_id, user_id, task_count
+    ),
+    statuses AS (
+        INSERT INTO status_task_counts AS c (status_id, task_count)
+        SELECT status_id, SUM(task_count) FROM removed WHERE status_id IS NOT NULL
+        GROUP BY status_id ORDER BY status_id
+        ON CONFLICT (status_id) DO UPDATE SET task_count = c.task_count + EXCLUDED.task_count
+    ),
+    users AS (
+        INSERT INTO user_task_counts AS c (user_id, task_count)
+        SELECT user_id, SUM(task_count) FROM removed WHERE user_id IS NOT NULL
+        GROUP BY user_id ORDER BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET task_count = c.task_count + EXCLUDED.task_count
+        RETURNING user_id, task_count
+    )
+    SELECT (SELECT COUNT(*) FROM removed),
+           (SELECT array_agg(user_id) FROM users WHERE task_count = 0)
+    INTO folded, emptied_users;
+
+    IF emptied_users IS NOT NULL THEN
+        DELETE FROM user_task_counts WHERE user_id = ANY(emptied_users) AND task_count = 0;
+    END IF;
+    UPDATE task_count_compaction SET compacted_through = GREATEST(compacted_through, last_delta);
+    RETURN folded;
+END;
+$$ LANGUAGE plpgsql;
+""".format(threshold=TASK_COUNTER_COMPACT_THRESHOLD)
+
+# Тригери рівня інструкції з перехідними таблицями: один COPY чи UPDATE на
+# мільйони рядків додає по одному рядку-зміні на статус і користувача
+TASK_COUNTER_TRIGGERS = COMPACT_TASK_COUNTS_FUNCTION + """
+CREATE OR REPLACE FUNCTION task_counts_on_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO task_count_deltas (status_id, task_count)
+    SELECT status_id, COUNT(*) FROM new_rows GROUP BY status_id;
+
+    INSERT INTO task_count_deltas (user_id, task_count)
+    SELECT user_id, COUNT(*) FROM new_rows GROUP BY user_id;
+
+    PERFORM compact_task_counts(false);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION task_counts_on_delete() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO task_count_deltas (status_id, task_count)
+    SELECT status_id, -COUNT(*) FROM old_rows GROUP BY status_id;
+
+    INSERT INTO task_count_deltas (user_id, task_count)
+    SELECT user_id, -COUNT(*) FROM old_rows GROUP BY user_id;
+
+    PERFORM compact_task_counts(false);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION task_counts_on_update() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO task_count_deltas (status_id, task_count)
+    SELECT status_id, SUM(delta) FROM (
+        SELECT status_id, 1 AS delta FROM new_rows
+        UNION ALL
+        SELECT status_id, -1 FROM old_rows
+    ) changes
+    GROUP BY status_id HAVING SUM(delta) <> 0;
+
+    INSERT INTO task_count_deltas (user_id, task_count)
+    SELECT user_id, SUM(delta) FROM (
+        SELECT user_id, 1 AS delta FROM new_rows
+        UNION ALL
+        SELECT user_id, -1 FROM old_rows
+    ) changes
+    GROUP BY user_id HAVING SUM(delta) <> 0;
+
+    PERFORM compact_task_counts(false);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION task_counts_on_truncate() RETURNS trigger AS $$
+BEGIN
+    TRUNCATE status_task_counts, user_task_counts, task_count_deltas;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER task_counts_insert
+AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION task_counts_on_insert();
+
+CREATE OR REPLACE TRIGGER task_counts_delete
+AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION task_counts_on_delete();
+
+CREATE OR REPLACE TRIGGER task_counts_update
+AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION task_counts_on_update();
+
+CREATE OR REPLACE TRIGGER task_counts_truncate
+AFTER TRUNCATE ON tasks
+FOR EACH STATEMENT EXECUTE FUNCTION task_counts_on_truncate();
+"""
+
+# Перерахунок лічильників з нуля - для даних, що існували до створення тригерів.
+# Бази з проміжною схемою без первинних ключів отримують їх після перерахунку
+REFRESH_TASK_COUNTERS = """
+TRUNCATE status_task_counts, user_task_counts, task_count_deltas;
+
+INSERT INTO status_task_counts (status_id, task_count)
+SELECT s.id, COUNT(t.id) FROM status s LEFT JOIN tasks t ON t.status_id = s.id GROUP BY s.id;
+
+INSERT INTO user_task_counts (user_id, task_count)
+SELECT user_id, COUNT(*) FROM tasks GROUP BY user_id;
+
+UPDATE task_count_compaction SET compacted_through = (SELECT last_value FROM task_count_deltas_id_seq);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'status_task_counts_pkey') THEN
+        ALTER TABLE status_task_counts ADD PRIMARY KEY (status_id);
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'user_task_counts_pkey') THEN
+        ALTER TABLE user_task_counts ADD PRIMARY KEY (user_id);
+    END IF;
+END;
+$$;
+"""
+
+# Примусове згортання всіх видимих рядків-змін; повертає кількість згорнутих
+COMPACT_TASK_COUNTERS = "SELECT compact_task_counts(true);"
+
+
+def create_task_counters(cursor: Cursor) -> None:
+    """Створює лічильники завдань, тригери для них і заповнює їх поточними даними"""
+    cursor.execute(CREATE_TASK_COUNTERS)
+    # Блокуємо tasks, щоб між перерахунком і появою тригерів не загубились зміни
+    cursor.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE;")
+    cursor.execute(TASK_COUNTER_TRIGGERS)
+    cursor.execute(REFRESH_TASK_COUNTERS)
+
+
+def compact_task_counters() -> bool:
+    """
+    Згортає всі рядки-зміни лічильників завдань у підсумки
+
+    Тригери згортають зміни самі, щойно їх набирається понад
+    TASK_COUNTER_COMPACT_THRESHOLD; ручний виклик потрібен лише щоб згорнути залишок.
+
+    Returns:
+        True якщо згортання виконано успішно
+    """
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return False
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(COMPACT_TASK_COUNTERS)
+            folded = cursor.fetchone()[0]
+        conn.commit()
+        print(f"Лічильники завдань згорнуто: {folded} рядків-змін")
+        return True
+    except Exception as e:
+        print(f"Помилка при згортанні лічильників завдань: {e}")
+        conn.rollback()
+        return False
+    finally:
+        release_connection(conn)
+
+
+def create_stat_statements(cursor: Cursor) -> None:
+    """
+    Створює розширення pg_stat_statements для режиму queries.py --instrument
+
+    Статистика збирається лише якщо сервер запущено з
+    shared_preload_libraries=pg_stat_statements (див. docker-compose.yml)
+    """
+    cursor.execute("SAVEPOINT stat_statements;")
+    try:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_stat_statements;")
+        cursor.execute("RELEASE SAVEPOINT stat_statements;")
+    except Exception as e:
+        print(f"Розширення pg_stat_statements недоступне ({e})")
+        cursor.execute("ROLLBACK TO SAVEPOINT stat_statements;")
+
+
+def create_indexes(cursor: Cursor) -> None:
+    """Створює індекси для таблиць tasks та users"""
+    for index_sql in FOREIGN_KEY_INDEXES:
+        cursor.execute(index_sql)
+
+    cursor.execute("SELECT id FROM status WHERE name = 'completed';")
+    completed = cursor.fetchone()
+    if completed:
+        cursor.execute(OPEN_TASKS_INDEX.format(completed_id=int(completed[0])))
+
+    cursor.execute("SAVEPOINT trgm;")
     try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="task_management",
-            user="postgres",
-            password="password",
-            port="5432"
-        )
-        return conn
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        cursor.execute(EMAIL_TRGM_INDEX)
+        cursor.execute("RELEASE SAVEPOINT trgm;")
     except Exception as e:
-        print(f"Помилка підключення до бази даних: {e}")
-        return None
+        print(f"Розширення pg_trgm недоступне ({e}), створюється індекс text_pattern_ops")
+        cursor.execute("ROLLBACK TO SAVEPOINT trgm;")
+        cursor.execute(EMAIL_PATTERN_INDEX)
+
+    cursor.execute(TASKS_SEARCH_INDEX)
+
+    # Оновлюємо статистику, щоб планувальник одразу врахував нові індекси
+    cursor.execute("ANALYZE users;")
+    cursor.execute("ANALYZE tasks;")
 
 
-def create_tables() -> None:
-    """Створює таблиці у базі даних"""
+def create_tables(partitions: Optional[int] = None) -> None:
+    """
+    Створює таблиці у базі даних
+
+    Args:
+        partitions: Якщо задано, таблиця tasks створюється розбитою на стільки
+                    розділів за хешем user_id (лише якщо її ще немає)
+    """
     
     # SQL для створення таблиці users
     create_users_table = """
@@ -64,7 +461,7 @@ def create_tables() -> None:
     ON CONFLICT (name) DO NOTHING;
     """
     
-    conn = create_connection()
+    conn = get_connection()
     if conn is None:
         print("Не вдалося підключитися до бази даних")
         return
@@ -80,13 +477,37 @@ def create_tables() -> None:
         print("Створення таблиці status...")
         cursor.execute(create_status_table)
         
-        print("Створення таблиці tasks...")
-        cursor.execute(create_tasks_table)
+        tasks_kind = get_table_kind(cursor, "tasks")
+        if partitions and tasks_kind is None:
+            print(f"Створення таблиці tasks з {partitions} розділами за хешем user_id...")
+            for statement in partitioned_tasks_ddl("tasks", partitions):
+                cursor.execute(statement)
+            cursor.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id;")
+        else:
+            if partitions and tasks_kind == 'r':
+                print("Таблиця tasks вже існує без розділів. "
+                      "Для перенесення даних: python create_tables.py --migrate-partitioned")
+            print("Створення таблиці tasks...")
+            cursor.execute(create_tasks_table)
+        
+        print("Додавання колонки повнотекстового пошуку...")
+        cursor.execute(TASKS_SEARCH_COLUMN)
         
         # Додаємо базові статуси
         print("Додавання базових статусів...")
         cursor.execute(insert_default_statuses)
         
+        print("Створення тригера сповіщень про зміну статусів...")
+        cursor.execute(STATUS_NOTIFY_TRIGGER)
+        
+        print("Створення індексів...")
+        create_indexes(cursor)
+        
+        print("Створення лічильників завдань...")
+        create_task_counters(cursor)
+        
+        create_stat_statements(cursor)
+
         # Підтверджуємо зміни
         conn.commit()
         print("Таблиці успішно створені!")
@@ -97,8 +518,214 @@ def create_tables() -> None:
     finally:
         if cursor:
             cursor.close()
-        conn.close()
+        release_connection(conn)
+
+
+def migrate_to_partitioned(partitions: int = DEFAULT_TASK_PARTITIONS) -> bool:
+    """
+    Переносить наявну таблицю tasks у варіант, розбитий за хешем user_id
+
+    Міграція виконується в одній транзакції під ексклюзивним блокуванням tasks:
+    дані копіюються у нову таблицю, стара видаляється, нова отримує її назву,
+    послідовність ID, індекси та тригери лічильників. У разі помилки все
+    відкочується і стара таблиця залишається без змін.
+
+    Args:
+        partitions: Кількість розділів
+
+    Returns:
+        True якщо міграція виконана
+    """
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return False
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        tasks_kind = get_table_kind(cursor, "tasks")
+        if tasks_kind is None:
+            print("Таблиці tasks немає. Створіть її: python create_tables.py --partitioned")
+            return False
+        if tasks_kind == 'p':
+            print("Таблиця tasks вже розбита на розділи")
+            return False
+
+        cursor.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE;")
+
+        print(f"Створення таблиці з {partitions} розділами...")
+        for statement in partitioned_tasks_ddl("tasks_partitioned", partitions, partition_prefix="tasks_p"):
+            cursor.execute(statement)
+
+        print("Копіювання завдань...")
+        # Індекси створюються після копіювання - так швидше, ніж оновлювати їх на кожен рядок
+        cursor.execute("""
+            INSERT INTO tasks_partitioned (id, title, description, status_id, user_id)
+            SELECT id, title, description, status_id, user_id FROM tasks;
+        """)
+        print(f"Скопійовано {cursor.rowcount} завдань")
+
+        # Послідовність належить tasks.id і видалилася б разом зі старою таблицею
+        cursor.execute("ALTER SEQUENCE tasks_id_seq OWNED BY NONE;")
+        cursor.execute("DROP TABLE tasks;")
+        cursor.execute("ALTER TABLE tasks_partitioned RENAME TO tasks;")
+        cursor.execute("ALTER INDEX tasks_partitioned_pkey RENAME TO tasks_pkey;")
+        cursor.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id;")
+
+        print("Створення індексів...")
+        create_indexes(cursor)
+
+        # Лічильники вже відповідають даним, потрібні лише тригери на новій таблиці
+        print("Створення тригерів лічильників...")
+        cursor.execute(TASK_COUNTER_TRIGGERS)
+
+        conn.commit()
+        print("Таблицю tasks перенесено у варіант з розділами")
+        return True
+
+    except Exception as e:
+        print(f"Помилка при міграції таблиці tasks: {e}")
+        conn.rollback()
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+
+def collect_index_names(plan: Any) -> Set[str]:
+    """Рекурсивно збирає назви індексів з плану EXPLAIN (FORMAT JSON)"""
+    names: Set[str] = set()
+    if isinstance(plan, list):
+        for item in plan:
+            names |= collect_index_names(item)
+    elif isinstance(plan, dict):
+        if "Index Name" in plan:
+            names.add(plan["Index Name"])
+        for value in plan.values():
+            if isinstance(value, (list, dict)):
+                names |= collect_index_names(value)
+    return names
+
+
+def get_index_checks(cursor: Cursor) -> List[Tuple[str, str, Set[str]]]:
+    """Повертає перевірки у форматі (опис, SQL, індекси, один з яких має бути в плані)"""
+    queries = parse_sql_file("queries.sql")
+    by_number = {query.number: (query.description, query.sql) for query in queries}
+
+    checks: List[Tuple[str, str, Set[str]]] = []
+    catalog_checks = [
+        (1, {"idx_tasks_user_id_id", "idx_tasks_open"}),
+        (2, {"idx_tasks_status_id_id", "idx_tasks_open"}),
+        (8, {"idx_users_email_trgm"}),
+        (11, {"idx_users_email_trgm"}),
+        (15, {"idx_tasks_search"}),
+    ]
+    for number, expected in catalog_checks:
+        if number in by_number:
+            description, query = by_number[number]
+            checks.append((description, query, expected))
+
+    # Каскадне видалення користувача виконує саме такий запит для кожного рядка users
+    checks.append(("Каскадне видалення завдань користувача",
+                   "DELETE FROM tasks WHERE user_id = 1",
+                   {"idx_tasks_user_id_id", "idx_tasks_open"}))
+
+    # Сторінка keyset-пагінації в межах статусу (pagination.py)
+    checks.append(("Сторінка завдань зі статусом",
+                   "SELECT id FROM tasks WHERE status_id = 1 AND id > 0 ORDER BY id LIMIT 50",
+                   {"idx_tasks_status_id_id"}))
+
+    cursor.execute("SELECT id FROM status WHERE name = 'completed';")
+    completed = cursor.fetchone()
+    if completed:
+        checks.append(("Незавершені завдання (частковий індекс)",
+                       f"SELECT status_id, user_id FROM tasks WHERE status_id <> {int(completed[0])}",
+                       {"idx_tasks_open"}))
+    return checks
+
+
+def verify_indexes() -> bool:
+    """
+    Перевіряє через EXPLAIN, що планувальник використовує створені індекси
+
+    На малих таблицях повне сканування дешевше за індекс, тому перевірка
+    вимикає enable_seqscan: так вона показує, що індекс придатний для запиту,
+    незалежно від поточного обсягу даних.
+
+    Returns:
+        True якщо всі перевірки пройдено
+    """
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return False
+
+    cursor = None
+    all_passed = True
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET LOCAL enable_seqscan = off;")
+
+        for description, query, expected in get_index_checks(cursor):
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {query}")
+            used = collect_index_names(cursor.fetchone()[0])
+            passed = bool(used & expected)
+            all_passed = all_passed and passed
+            mark = "OK " if passed else "НІ "
+            print(f"[{mark}] {description}")
+            print(f"      очікувано: {', '.join(sorted(expected))}; "
+                  f"у плані: {', '.join(sorted(used)) or 'жодного індексу'}")
+
+    except Exception as e:
+        print(f"Помилка при перевірці індексів: {e}")
+        all_passed = False
+    finally:
+        # EXPLAIN без ANALYZE нічого не змінює, але SET LOCAL скидаємо відкатом
+        conn.rollback()
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+    print("Усі індекси використовуються" if all_passed else "Деякі індекси не використовуються")
+    return all_passed
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    import sys
+
+    args = sys.argv[1:]
+
+    if args and args[0] in ("--partitioned", "--migrate-partitioned") and len(args) <= 2:
+        # Кількість розділів приймають лише режими з розділами
+        try:
+            partitions = int(args[1]) if len(args) == 2 else DEFAULT_TASK_PARTITIONS
+        except ValueError:
+            print("Помилка: Кількість розділів має бути цілим числом")
+            return
+        if partitions < 1:
+            print("Помилка: Кількість розділів має бути додатною")
+            return
+        if args[0] == "--partitioned":
+            create_tables(partitions)
+        else:
+            migrate_to_partitioned(partitions)
+    elif not args:
+        create_tables()
+    elif args == ["--check"]:
+        verify_indexes()
+    elif args == ["--compact-counters"]:
+        compact_task_counters()
+    else:
+        print("Використання:")
+        print("  python create_tables.py                              - створити таблиці")
+        print("  python create_tables.py --partitioned [розділи]      - створити tasks з розділами за user_id")
+        print("  python create_tables.py --migrate-partitioned [розділи] - перенести наявну tasks у розділи")
+        print("  python create_tables.py --check                      - перевірити використання індексів")
+        print("  python create_tables.py --compact-counters           - згорнути рядки-зміни лічильників завдань")
 
 
 if __name__ == "__main__":
-    create_tables()
+    main()
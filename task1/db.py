@@ -0,0 +1,233 @@
+"""
+Спільний пул з'єднань з базою даних PostgreSQL для скриптів завдання 1
+
+Параметри підключення беруться зі змінних оточення:
+    PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD - стандартні змінні libpq
+    PG_POOL_MIN, PG_POOL_MAX - мінімальна та максимальна кількість з'єднань у пулі
+    PG_POOL_HEALTHCHECK_INTERVAL - через скільки секунд простою з'єднання
+                                   перевіряється запитом SELECT 1 перед видачею
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Optional, Dict, List, Iterator
+import psycopg2
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+
+POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+POOL_MAX = int(os.getenv("PG_POOL_MAX", "10"))
+HEALTHCHECK_INTERVAL = float(os.getenv("PG_POOL_HEALTHCHECK_INTERVAL", "30"))
+
+
+class ReusingConnectionPool(ThreadedConnectionPool):
+    """
+    ThreadedConnectionPool, що тримає до maxconn вільних з'єднань
+
+    Стандартний пул закриває кожне повернуте з'єднання понад minconn, і
+    при паралельній роботі з'єднання постійно відкриваються наново, втрачаючи
+    стан сесії (наприклад, підготовлені запити).
+    """
+
+    def _putconn(self, conn: connection, key: Any = None, close: bool = False) -> None:
+        if self.closed:
+            raise PoolError("connection pool is closed")
+
+        if key is None:
+            key = self._rused.get(id(conn))
+            if key is None:
+                raise PoolError("trying to put unkeyed connection")
+
+        if close or conn.closed:
+            conn.close()
+        else:
+            self._pool.append(conn)
+
+        if not self.closed or key in self._used:
+            del self._used[key]
+            del self._rused[id(conn)]
+
+
+_pool: Optional[ReusingConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool кидає PoolError, коли з'єднання закінчились;
+# семафор змушує потоки чекати на звільнене з'єднання замість помилки
+_pool_slots = threading.BoundedSemaphore(POOL_MAX)
+_last_used: Dict[int, float] = {}
+# Стан сесії, прив'язаний до конкретного з'єднання (наприклад, підготовлені запити)
+_connection_state: Dict[int, Dict[str, Any]] = {}
+# Пули, успадковані від батьківського процесу після fork. Їх не можна закривати
+# (це розірвало б з'єднання батька), тож лише тримаємо посилання до завершення процесу
+_inherited_pools: List[ReusingConnectionPool] = []
+
+
+def get_connection_params() -> Dict[str, str]:
+    """Повертає параметри підключення з урахуванням змінних оточення"""
+    return {
+        "host": os.getenv("PGHOST", "localhost"),
+        "port": os.getenv("PGPORT", "5432"),
+        "database": os.getenv("PGDATABASE", "task_management"),
+        "user": os.getenv("PGUSER", "postgres"),
+        "password": os.getenv("PGPASSWORD", "password"),
+    }
+
+
+def get_pool() -> ReusingConnectionPool:
+    """Повертає пул з'єднань поточного процесу, створюючи його за потреби"""
+    global _pool, _pool_pid, _pool_slots
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid != os.getpid():
+            _inherited_pools.append(_pool)
+            _pool = None
+        if _pool is None:
+            _pool = ReusingConnectionPool(POOL_MIN, POOL_MAX, **get_connection_params())
+            _pool_pid = os.getpid()
+            _pool_slots = threading.BoundedSemaphore(POOL_MAX)
+            _last_used.clear()
+            _connection_state.clear()
+        return _pool
+
+
+def _is_healthy(conn: connection) -> bool:
+    """Перевіряє, що з'єднання з пулу придатне до використання"""
+    if conn.closed:
+        return False
+
+    last_used = _last_used.get(id(conn))
+    if last_used is not None and time.monotonic() - last_used < HEALTHCHECK_INTERVAL:
+        return True
+
+    # З'єднання давно простоювало - сервер або мережа могли його розірвати
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1;")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _forget(conn: connection) -> None:
+    """Видаляє відомості про з'єднання, яке закривається"""
+    _last_used.pop(id(conn), None)
+    _connection_state.pop(id(conn), None)
+
+
+def connection_state(conn: connection) -> Dict[str, Any]:
+    """
+    Повертає словник стану сесії для з'єднання з пулу
+
+    Стан живе, доки з'єднання не закрито, і дозволяє, наприклад, готувати
+    запит через PREPARE лише один раз на з'єднання.
+    """
+    return _connection_state.setdefault(id(conn), {})
+
+
+def get_connection() -> Optional[connection]:
+    """
+    Бере з'єднання з пулу
+
+    Якщо всі з'єднання зайняті, чекає, поки якесь повернуть. Непрацездатні
+    з'єднання закриваються і замінюються новими.
+
+    Returns:
+        З'єднання або None, якщо підключитися не вдалося
+    """
+    try:
+        db_pool = get_pool()
+    except Exception as e:
+        print(f"Помилка підключення до бази даних: {e}")
+        return None
+
+    slots = _pool_slots
+    slots.acquire()
+    try:
+        # Кожна спроба або повертає живе з'єднання, або закриває мертве,
+        # тож після POOL_MAX спроб пул гарантовано відкриє нове
+        for _ in range(POOL_MAX + 1):
+            conn = db_pool.getconn()
+            if _is_healthy(conn):
+                return conn
+            _forget(conn)
+            db_pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("не вдалося отримати робоче з'єднання з пулу")
+    except Exception as e:
+        slots.release()
+        print(f"Помилка підключення до бази даних: {e}")
+        return None
+
+
+def release_connection(conn: Optional[connection], close: bool = False) -> None:
+    """
+    Повертає з'єднання до пулу
+
+    Незавершена транзакція відкочується, щоб наступний користувач отримав
+    з'єднання у чистому стані.
+
+    Args:
+        conn: З'єднання, отримане через get_connection()
+        close: Закрити з'єднання замість повторного використання
+    """
+    if conn is None:
+        return
+
+    if not conn.closed and not close:
+        try:
+            if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = False
+        except psycopg2.Error:
+            close = True
+
+    if conn.closed or close:
+        _forget(conn)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+
+    with _pool_lock:
+        db_pool = _pool if _pool_pid == os.getpid() else None
+    if db_pool is None:
+        conn.close()
+        return
+
+    try:
+        db_pool.putconn(conn, close=close or bool(conn.closed))
+    finally:
+        _pool_slots.release()
+
+
+@contextmanager
+def pooled_connection() -> Iterator[connection]:
+    """
+    Контекстний менеджер для з'єднання з пулу
+
+    Raises:
+        psycopg2.OperationalError: якщо підключитися не вдалося
+    """
+    conn = get_connection()
+    if conn is None:
+        raise psycopg2.OperationalError("Не вдалося підключитися до бази даних")
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def close_pool() -> None:
+    """Закриває всі з'єднання пулу поточного процесу"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _last_used.clear()
+        _connection_state.clear()
+
+
+atexit.register(close_pool)
@@ -0,0 +1,185 @@
+"""
+Експорт результатів запитів каталогу через COPY (query) TO STDOUT
+
+Сервер сам форматує рядки у CSV, а клієнт лише переписує потік у файл, тож
+великі звіти вивантажуються зі швидкістю сервера і не накопичуються в пам'яті.
+Для Parquet та Arrow той самий CSV-потік розбирається pyarrow блоками по
+block_size байтів з типами колонок, взятими з опису результату запиту.
+"""
+import os
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from psycopg2.extensions import connection
+from catalog import CatalogQuery
+from db import get_connection, release_connection
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+EXPORT_FORMATS = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# OID типів PostgreSQL, для яких є точний відповідник в Arrow; решта
+# колонок (numeric, дати, текст) зберігається рядками без втрати точності
+ARROW_TYPE_NAMES = {
+    16: 'bool_',
+    20: 'int64',
+    21: 'int16',
+    23: 'int32',
+    700: 'float32',
+    701: 'float64',
+}
+
+# Параметри розбору CSV, який пише COPY
+COPY_CSV_CONVERT_OPTIONS = {
+    # COPY пише NULL як порожнє поле без лапок, а порожній рядок як "";
+    # без null_values pyarrow вважав би NULL також NA, N/A, NULL, null, NaN...
+    'null_values': [''],
+    'strings_can_be_null': True,
+    'quoted_strings_can_be_null': False,
+    # boolean у CSV COPY - це t/f
+    'true_values': ['t'],
+    'false_values': ['f'],
+}
+
+
+def export_format(file_path: str) -> Optional[str]:
+    """Визначає формат експорту за розширенням файлу"""
+    return EXPORT_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+
+def copy_sql(query: str) -> str:
+    """Обгортає запит у COPY ... TO STDOUT у форматі CSV із заголовком"""
+    return f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)"
+
+
+def result_columns(conn: connection, query: str) -> List[Tuple[str, Any]]:
+    """Повертає назви колонок результату та їхні типи Arrow без виконання запиту"""
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM ({query}) AS q LIMIT 0")
+        columns = [(desc[0], getattr(pa, ARROW_TYPE_NAMES.get(desc[1], 'string'))())
+                   for desc in cursor.description]
+    conn.rollback()
+    return columns
+
+
+def export_csv(conn: connection, query: str, file_path: str) -> int:
+    """Записує результат запиту у CSV файл без розбору рядків на клієнті"""
+    with open(file_path, 'wb') as file, conn.cursor() as cursor:
+        cursor.copy_expert(copy_sql(query), file)
+        return cursor.rowcount
+
+
+def export_arrow(conn: connection, query: str, file_path: str, file_format: str,
+                 block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Перетворює CSV-потік COPY у Parquet або Arrow IPC блоками
+
+    COPY пише у канал в окремому потоці, а pyarrow читає з іншого кінця, тож
+    у пам'яті одночасно перебуває лише один блок.
+
+    Returns:
+        Кількість записаних рядків
+    """
+    columns = result_columns(conn, query)
+    convert_options = pa_csv.ConvertOptions(column_types=dict(columns), **COPY_CSV_CONVERT_OPTIONS)
+    read_options = pa_csv.ReadOptions(block_size=block_size)
+    # Описи завдань можуть містити переноси рядків у лапках
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+
+    read_fd, write_fd = os.pipe()
+    copy_errors: List[Exception] = []
+
+    def produce() -> None:
+        try:
+            with os.fdopen(write_fd, 'wb') as sink, conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql(query), sink)
+        except Exception as e:
+            copy_errors.append(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    rows = 0
+    try:
+        # Закриття каналу при помилці читання перериває COPY у потоці-виробнику
+        with os.fdopen(read_fd, 'rb') as source:
+            reader = pa_csv.open_csv(source, read_options=read_options, parse_options=parse_options,
+                                     convert_options=convert_options)
+            if file_format == 'parquet':
+                writer = pq.ParquetWriter(file_path, reader.schema)
+            else:
+                writer = pa.ipc.new_file(file_path, reader.schema)
+            with writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+    finally:
+        producer.join()
+    if copy_errors:
+        raise copy_errors[0]
+    return rows
+
+
+def export_query(catalog_query: CatalogQuery, file_path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Експортує результат запиту каталогу на читання у файл
+
+    Формат визначається розширенням: .csv, .parquet, .arrow/.feather.
+
+    Args:
+        catalog_query: Запит каталогу на читання
+        file_path: Шлях до файлу
+        block_size: Розмір блоку CSV у байтах для перетворення у Parquet/Arrow
+
+    Returns:
+        Кількість експортованих рядків
+
+    Raises:
+        ValueError: якщо формат невідомий або запит змінює дані
+        ImportError: якщо для Parquet/Arrow не встановлено pyarrow
+        ConnectionError: якщо не вдалося підключитися до бази даних
+    """
+    file_format = export_format(file_path)
+    if file_format is None:
+        raise ValueError(f"Невідомий формат файлу, підтримуються: {', '.join(EXPORT_FORMATS)}")
+    if catalog_query.is_write:
+        raise ValueError("Експортувати можна лише запити на читання")
+    query = catalog_query.sql
+    if file_format != 'csv' and pa is None:
+        raise ImportError("Для експорту у Parquet/Arrow встановіть pyarrow: pip install pyarrow")
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    started = time.perf_counter()
+    broken = False
+    try:
+        if file_format == 'csv':
+            rows = export_csv(conn, query, file_path)
+        else:
+            rows = export_arrow(conn, query, file_path, file_format, block_size)
+        conn.rollback()
+    except Exception:
+        # Перерваний посеред потоку COPY залишає з'єднання в невизначеному
+        # стані, тож після помилки Parquet/Arrow воно не повертається в пул
+        broken = file_format != 'csv'
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        raise
+    finally:
+        release_connection(conn, close=broken)
+
+    elapsed = time.perf_counter() - started
+    size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    print(f"Експортовано {rows} рядків у {file_path} ({size_mb:.1f} МБ) за {elapsed:.2f} с "
+          f"({rows / elapsed if elapsed else 0:,.0f} рядків/с)")
+    return rows
@@ -0,0 +1,237 @@
+"""
+Вимірювання запитів каталогу queries.sql
+
+Кожен запит виконується через EXPLAIN (ANALYZE, BUFFERS, TIMING OFF), тож
+за одне виконання відомі час на клієнті, час планування та виконання на
+сервері, кількість рядків і звернення до спільних буферів (знайдено в кеші /
+прочитано з диска). TIMING OFF вимикає вимір часу кожного вузла плану, який
+помітно сповільнює запити. Запити на зміну даних комітяться, як і при
+звичайному виконанні.
+
+Якщо на сервері встановлено pg_stat_statements, додатково знімаються
+різниці його лічильників до і після прогону. Результат виводиться у форматі
+JSON lines (один об'єкт на запит) або текстовому форматі Prometheus.
+"""
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from psycopg2.extensions import connection
+from catalog import CatalogQuery
+from db import get_connection, release_connection
+
+
+OUTPUT_FORMATS = ('json', 'prometheus')
+METRIC_PREFIX = "catalog_query"
+
+STAT_STATEMENTS_SQL = """
+SELECT queryid, query, calls, total_exec_time, rows, shared_blks_hit, shared_blks_read
+FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+# (calls, total_exec_time, rows, shared_blks_hit, shared_blks_read)
+StatementCounters = Tuple[int, float, int, int, int]
+
+
+def plan_rows(plan: Dict[str, Any]) -> int:
+    """Кількість рядків з кореневого вузла плану; для змін - з вузла під ModifyTable"""
+    if plan.get("Node Type") == "ModifyTable" and plan.get("Plans"):
+        return int(plan["Plans"][0].get("Actual Rows", 0))
+    return int(plan.get("Actual Rows", 0))
+
+
+def measure_query(conn: connection, query: CatalogQuery) -> Dict[str, Any]:
+    """
+    Виконує запит під EXPLAIN ANALYZE і повертає його метрики
+
+    Args:
+        conn: З'єднання з базою даних
+        query: Запит каталогу
+
+    Returns:
+        Словник з метриками або з описом помилки
+    """
+    result: Dict[str, Any] = {"query": query.number, "description": query.description,
+                              "type": "write" if query.is_write else "read"}
+    try:
+        with conn.cursor() as cursor:
+            started = time.perf_counter()
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) {query.sql}")
+            explain = cursor.fetchone()[0][0]
+            wall_ms = (time.perf_counter() - started) * 1000
+        if query.is_write:
+            conn.commit()
+        else:
+            conn.rollback()
+    except Exception as e:
+        conn.rollback()
+        result["error"] = str(e)
+        return result
+
+    plan = explain["Plan"]
+    result.update({
+        "wall_ms": round(wall_ms, 3),
+        "planning_ms": round(explain.get("Planning Time", 0.0), 3),
+        "execution_ms": round(explain.get("Execution Time", 0.0), 3),
+        "rows": plan_rows(plan),
+        "shared_hit_blocks": int(plan.get("Shared Hit Blocks", 0)),
+        "shared_read_blocks": int(plan.get("Shared Read Blocks", 0)),
+    })
+    return result
+
+
+def has_stat_statements(conn: connection) -> bool:
+    """
+    Перевіряє, чи можна читати pg_stat_statements
+
+    Розширення можна створити і без shared_preload_libraries, але тоді читання
+    представлення завершується помилкою, тож перевіряємо саме читання.
+    """
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements';")
+            if cursor.fetchone() is None:
+                return False
+            cursor.execute("SELECT 1 FROM pg_stat_statements LIMIT 1;")
+        return True
+    except Exception:
+        return False
+    finally:
+        conn.rollback()
+
+
+def snapshot_stat_statements(conn: connection) -> Dict[int, Tuple[str, StatementCounters]]:
+    """Знімає лічильники pg_stat_statements поточної бази даних"""
+    with conn.cursor() as cursor:
+        cursor.execute(STAT_STATEMENTS_SQL)
+        snapshot = {queryid: (query, (calls, total_exec_time, rows, hit, read))
+                    for queryid, query, calls, total_exec_time, rows, hit, read in cursor.fetchall()}
+    conn.rollback()
+    return snapshot
+
+
+def stat_statements_delta(before: Dict[int, Tuple[str, StatementCounters]],
+                          after: Dict[int, Tuple[str, StatementCounters]]) -> List[Dict[str, Any]]:
+    """Повертає різниці лічильників для інструкцій, що виконувались між знімками"""
+    deltas = []
+    for queryid, (query, counters) in after.items():
+        previous = before.get(queryid, (query, (0, 0.0, 0, 0, 0)))[1]
+        calls, exec_ms, rows, hit, read = (now - then for now, then in zip(counters, previous))
+        if calls <= 0:
+            continue
+        deltas.append({
+            "queryid": queryid,
+            "statement": " ".join(query.split()),
+            "calls": calls,
+            "total_exec_ms": round(exec_ms, 3),
+            "mean_exec_ms": round(exec_ms / calls, 3),
+            "rows": rows,
+            "shared_hit_blocks": hit,
+            "shared_read_blocks": read,
+        })
+    deltas.sort(key=lambda item: item["total_exec_ms"], reverse=True)
+    return deltas
+
+
+def escape_label(value: Any) -> str:
+    """Екранує значення мітки для текстового формату Prometheus"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_prometheus(results: List[Dict[str, Any]], deltas: Optional[List[Dict[str, Any]]]) -> str:
+    """Формує метрики у текстовому форматі Prometheus"""
+    metrics = [
+        ("wall_seconds", "wall_ms", 1000, "Час виконання запиту на клієнті"),
+        ("planning_seconds", "planning_ms", 1000, "Час планування запиту на сервері"),
+        ("execution_seconds", "execution_ms", 1000, "Час виконання запиту на сервері"),
+        ("rows", "rows", 1, "Кількість рядків результату або змінених рядків"),
+        ("shared_hit_blocks", "shared_hit_blocks", 1, "Блоки, знайдені у спільних буферах"),
+        ("shared_read_blocks", "shared_read_blocks", 1, "Блоки, прочитані поза спільними буферами"),
+    ]
+    lines = []
+    for name, key, divisor, help_text in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        for result in results:
+            if key in result:
+                labels = f'query="{result["query"]}",type="{result["type"]}"'
+                lines.append(f"{METRIC_PREFIX}_{name}{{{labels}}} {result[key] / divisor}")
+
+    errors = [result for result in results if "error" in result]
+    lines.append(f"# HELP {METRIC_PREFIX}_errors Запити, що завершились помилкою")
+    lines.append(f"# TYPE {METRIC_PREFIX}_errors gauge")
+    for result in errors:
+        lines.append(f'{METRIC_PREFIX}_errors{{query="{result["query"]}"}} 1')
+
+    if deltas is not None:
+        statement_metrics = [
+            ("calls", "calls", 1, "Виклики інструкції за час прогону"),
+            ("exec_seconds", "total_exec_ms", 1000, "Сумарний час виконання інструкції за час прогону"),
+            ("rows", "rows", 1, "Рядки, оброблені інструкцією за час прогону"),
+            ("shared_hit_blocks", "shared_hit_blocks", 1, "Блоки зі спільних буферів за час прогону"),
+            ("shared_read_blocks", "shared_read_blocks", 1, "Блоки, прочитані з диска за час прогону"),
+        ]
+        for name, key, divisor, help_text in statement_metrics:
+            lines.append(f"# HELP pg_stat_statements_{name} {help_text}")
+            lines.append(f"# TYPE pg_stat_statements_{name} gauge")
+            for delta in deltas:
+                labels = f'queryid="{delta["queryid"]}",statement="{escape_label(delta["statement"][:120])}"'
+                lines.append(f"pg_stat_statements_{name}{{{labels}}} {delta[key] / divisor}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def instrument_queries(queries: List[CatalogQuery], output_format: str = 'json',
+                       stat_statements: bool = False, output: Optional[TextIO] = None) -> List[Dict[str, Any]]:
+    """
+    Вимірює запити каталогу і виводить метрики
+
+    Args:
+        queries: Запити каталогу
+        output_format: 'json' (JSON lines) або 'prometheus'
+        stat_statements: Додати різниці лічильників pg_stat_statements
+        output: Куди писати метрики (за замовчуванням stdout)
+
+    Returns:
+        Метрики кожного запиту
+
+    Raises:
+        ValueError: якщо формат невідомий
+        ConnectionError: якщо не вдалося підключитися до бази даних
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Невідомий формат '{output_format}', доступні: {', '.join(OUTPUT_FORMATS)}")
+    output = output or sys.stdout
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    deltas: Optional[List[Dict[str, Any]]] = None
+    try:
+        before = None
+        if stat_statements:
+            if has_stat_statements(conn):
+                before = snapshot_stat_statements(conn)
+            else:
+                # Метрики йдуть у stdout, тож попередження пишемо окремо
+                print("pg_stat_statements не встановлено: додайте його до shared_preload_libraries "
+                      "і виконайте CREATE EXTENSION pg_stat_statements;", file=sys.stderr)
+
+        results = [measure_query(conn, query) for query in queries]
+
+        if before is not None:
+            deltas = stat_statements_delta(before, snapshot_stat_statements(conn))
+    finally:
+        release_connection(conn)
+
+    if output_format == 'json':
+        for result in results:
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        for delta in deltas or []:
+            output.write(json.dumps({"pg_stat_statements": delta}, ensure_ascii=False) + '\n')
+    else:
+        output.write(format_prometheus(results, deltas))
+    output.flush()
+    return results
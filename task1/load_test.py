@@ -0,0 +1,359 @@
+"""
+Навантажувальний тест конкурентних змін даних
+
+N потоків одночасно виконують суміш запитів каталогу, що змінюють дані:
+3 (зміна статусу завдання), 5 (нове завдання), 7 (видалення завдання) та
+9 (перейменування користувача), через їхні підготовлені аналоги з prepared.py
+з випадковими аргументами. Так під навантаженням перевіряються зовнішні
+ключі на status_id та user_id, тригери лічильників завдань і блокування
+рядків users та tasks.
+
+Окремий потік раз на SAMPLE_INTERVAL секунд рахує очікування блокувань у
+pg_locks. Звіт містить пропускну здатність, перцентилі затримок для кожного
+типу запиту, очікування блокувань, взаємні блокування (deadlock) та помилки
+серіалізації.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import psycopg2
+from psycopg2 import errorcodes
+from psycopg2.extensions import (ISOLATION_LEVEL_READ_COMMITTED, ISOLATION_LEVEL_REPEATABLE_READ,
+                                 ISOLATION_LEVEL_SERIALIZABLE)
+from benchmark import summarize_timings
+from db import POOL_MAX, get_connection, release_connection
+from prepared import PreparedQuery, execute_prepared, find_prepared_query
+from status_cache import get_status_ids
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_DURATION = 30.0
+SAMPLE_INTERVAL = 0.1
+
+# Запит каталогу -> відносна частота в суміші
+DEFAULT_MIX: Dict[int, int] = {3: 5, 5: 3, 7: 1, 9: 1}
+
+ISOLATION_LEVELS = {
+    "read_committed": ISOLATION_LEVEL_READ_COMMITTED,
+    "repeatable_read": ISOLATION_LEVEL_REPEATABLE_READ,
+    "serializable": ISOLATION_LEVEL_SERIALIZABLE,
+}
+
+# Помилки, після яких транзакцію слід повторити; у звіті рахуються окремо
+RETRYABLE_ERRORS = {
+    errorcodes.DEADLOCK_DETECTED: "deadlocks",
+    errorcodes.SERIALIZATION_FAILURE: "serialization_failures",
+}
+
+LOCK_WAITS_SQL = """
+SELECT COUNT(*) FROM pg_locks
+WHERE NOT granted AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+
+class WorkloadRanges:
+    """Діапазони ID та статуси для генерації випадкових аргументів"""
+
+    def __init__(self, min_task_id: int, max_task_id: int, min_user_id: int, max_user_id: int,
+                 statuses: List[str]) -> None:
+        self.min_task_id = min_task_id
+        self.max_task_id = max_task_id
+        self.min_user_id = min_user_id
+        self.max_user_id = max_user_id
+        self.statuses = statuses
+
+
+def load_ranges() -> WorkloadRanges:
+    """Читає поточні діапазони ID завдань і користувачів"""
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT MIN(id), MAX(id) FROM tasks;")
+            min_task_id, max_task_id = cursor.fetchone()
+            cursor.execute("SELECT MIN(id), MAX(id) FROM users;")
+            min_user_id, max_user_id = cursor.fetchone()
+        conn.rollback()
+        statuses = sorted(get_status_ids(conn))
+    finally:
+        release_connection(conn)
+
+    if min_user_id is None:
+        raise ValueError("Таблиця users порожня, заповніть базу: python seed.py bulk ...")
+    return WorkloadRanges(min_task_id or 1, max_task_id or 1, min_user_id, max_user_id, statuses)
+
+
+def random_args(number: int, ranges: WorkloadRanges, rng: random.Random) -> Tuple[Any, ...]:
+    """Генерує випадкові аргументи для запиту каталогу"""
+    if number == 3:
+        return rng.randint(ranges.min_task_id, ranges.max_task_id), rng.choice(ranges.statuses)
+    if number == 5:
+        return (f"Навантажувальне завдання {rng.randrange(10**9)}", None,
+                rng.choice(ranges.statuses), rng.randint(ranges.min_user_id, ranges.max_user_id))
+    if number == 7:
+        return (rng.randint(ranges.min_task_id, ranges.max_task_id),)
+    if number == 9:
+        return rng.randint(ranges.min_user_id, ranges.max_user_id), f"Користувач {rng.randrange(10**6)}"
+    raise ValueError(f"Запит {number} не входить до навантажувальної суміші")
+
+
+def run_worker(index: int, queries: List[PreparedQuery], weights: List[int], ranges: WorkloadRanges,
+               deadline: float, ops_per_tx: int, isolation: int, seed: int,
+               results: Dict[str, Any], lock: threading.Lock) -> None:
+    """
+    Виконує транзакції з випадкових запитів суміші до настання deadline
+
+    Кожна транзакція містить ops_per_tx запитів; при кількох запитах у
+    транзакції їхній порядок випадковий, тож можливі взаємні блокування.
+    """
+    rng = random.Random(seed + index)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    counters: Counter = Counter()
+
+    conn = get_connection()
+    if conn is None:
+        with lock:
+            results["errors"]["connection"] += 1
+        return
+    previous_isolation = conn.isolation_level
+    try:
+        conn.set_session(isolation_level=isolation)
+        with conn.cursor() as cursor:
+            while time.perf_counter() < deadline:
+                batch = rng.choices(queries, weights=weights, k=ops_per_tx)
+                tx_started = time.perf_counter()
+                op_timings: List[Tuple[str, float]] = []
+                try:
+                    for query in batch:
+                        started = time.perf_counter()
+                        execute_prepared(conn, cursor, query, random_args(query.number, ranges, rng))
+                        op_timings.append((query.name, (time.perf_counter() - started) * 1000))
+                    conn.commit()
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    error_name = errorcodes.lookup(e.pgcode) if e.pgcode else type(e).__name__
+                    counters[RETRYABLE_ERRORS.get(e.pgcode, error_name)] += 1
+                    continue
+
+                latencies["transaction"].append((time.perf_counter() - tx_started) * 1000)
+                for name, elapsed_ms in op_timings:
+                    latencies[name].append(elapsed_ms)
+                counters["transactions"] += 1
+                counters["operations"] += len(batch)
+    finally:
+        # Рівень ізоляції зберігається в з'єднанні, тож повертаємо попередній перед поверненням у пул
+        conn.rollback()
+        conn.set_session(isolation_level=previous_isolation if previous_isolation is not None else "DEFAULT")
+        release_connection(conn)
+
+    with lock:
+        for name, values in latencies.items():
+            results["latencies"][name].extend(values)
+        for name, count in counters.items():
+            if name in ("transactions", "operations"):
+                results[name] += count
+            else:
+                results["errors"][name] += count
+
+
+def sample_lock_waits(stop: threading.Event, samples: List[int]) -> None:
+    """Періодично рахує незадоволені запити на блокування в поточній базі"""
+    conn = get_connection()
+    if conn is None:
+        return
+    try:
+        # Кожна вибірка має бачити поточний стан, а не знімок транзакції
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            while not stop.wait(SAMPLE_INTERVAL):
+                cursor.execute(LOCK_WAITS_SQL)
+                samples.append(cursor.fetchone()[0])
+    finally:
+        release_connection(conn)
+
+
+def database_deadlocks() -> Optional[int]:
+    """Лічильник взаємних блокувань поточної бази з pg_stat_database"""
+    conn = get_connection()
+    if conn is None:
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT deadlocks FROM pg_stat_database WHERE datname = current_database();")
+            row = cursor.fetchone()
+        conn.rollback()
+        return row[0] if row else None
+    finally:
+        release_connection(conn)
+
+
+def run_load_test(workers: int = DEFAULT_WORKERS, duration: float = DEFAULT_DURATION,
+                  mix: Optional[Dict[int, int]] = None, ops_per_tx: int = 1,
+                  isolation: str = "read_committed", seed: int = 42,
+                  output_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Запускає навантажувальний тест і виводить звіт
+
+    Args:
+        workers: Кількість потоків, кожен зі своїм з'єднанням з пулу
+        duration: Тривалість у секундах
+        mix: Номер запиту каталогу -> відносна частота (за замовчуванням DEFAULT_MIX)
+        ops_per_tx: Кількість запитів в одній транзакції
+        isolation: Рівень ізоляції транзакцій (read_committed, repeatable_read, serializable)
+        seed: Зерно генератора аргументів
+        output_path: Файл для JSON звіту (за замовчуванням звіт лише виводиться)
+
+    Returns:
+        Звіт або None у випадку помилки
+    """
+    mix = mix or DEFAULT_MIX
+    if ops_per_tx < 1:
+        print("Кількість запитів у транзакції має бути додатною")
+        return None
+    if any(weight <= 0 for weight in mix.values()):
+        print("Частоти запитів мають бути додатними")
+        return None
+    if isolation not in ISOLATION_LEVELS:
+        print(f"Невідомий рівень ізоляції '{isolation}', доступні: {', '.join(ISOLATION_LEVELS)}")
+        return None
+    # Ще одне з'єднання потрібне потоку, що рахує очікування блокувань
+    if workers + 1 > POOL_MAX:
+        print(f"Пул має {POOL_MAX} з'єднань, а потрібно {workers + 1}: "
+              f"збільште PG_POOL_MAX або зменште кількість потоків")
+        return None
+
+    queries: List[PreparedQuery] = []
+    for number in mix:
+        query = find_prepared_query(str(number))
+        if query is None or not query.is_write:
+            print(f"Запит {number} не є запитом на зміну даних")
+            return None
+        queries.append(query)
+    weights = [mix[query.number] for query in queries]
+
+    try:
+        ranges = load_ranges()
+    except Exception as e:
+        print(f"Помилка: {e}")
+        return None
+
+    results: Dict[str, Any] = {"transactions": 0, "operations": 0,
+                               "latencies": defaultdict(list), "errors": Counter()}
+    lock = threading.Lock()
+    lock_wait_samples: List[int] = []
+    stop_sampling = threading.Event()
+    deadlocks_before = database_deadlocks()
+
+    print(f"{workers} потоків, {duration:.0f} с, суміш "
+          f"{', '.join(f'{query.name}={weight}' for query, weight in zip(queries, weights))}, "
+          f"{ops_per_tx} запит(ів) у транзакції, {isolation}")
+
+    sampler = threading.Thread(target=sample_lock_waits, args=(stop_sampling, lock_wait_samples), daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=run_worker,
+                                args=(index, queries, weights, ranges, deadline, ops_per_tx,
+                                      ISOLATION_LEVELS[isolation], seed, results, lock))
+               for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop_sampling.set()
+    sampler.join()
+
+    deadlocks_after = database_deadlocks()
+    report: Dict[str, Any] = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "workers": workers,
+        "duration_s": round(elapsed, 3),
+        "ops_per_tx": ops_per_tx,
+        "isolation": isolation,
+        "mix": {query.name: weight for query, weight in zip(queries, weights)},
+        "transactions": results["transactions"],
+        "operations": results["operations"],
+        "transactions_per_s": round(results["transactions"] / elapsed, 1),
+        "operations_per_s": round(results["operations"] / elapsed, 1),
+        "latency": {name: summarize_timings(values) for name, values in results["latencies"].items()},
+        "lock_waits": {
+            "samples": len(lock_wait_samples),
+            "max_waiting": max(lock_wait_samples, default=0),
+            "mean_waiting": round(sum(lock_wait_samples) / len(lock_wait_samples), 2) if lock_wait_samples else 0.0,
+            "samples_with_waits": sum(1 for count in lock_wait_samples if count),
+        },
+        "errors": dict(results["errors"]),
+        "server_deadlocks": (deadlocks_after - deadlocks_before
+                             if deadlocks_before is not None and deadlocks_after is not None else None),
+    }
+
+    print(f"\nТранзакцій: {report['transactions']} ({report['transactions_per_s']}/с), "
+          f"запитів: {report['operations']} ({report['operations_per_s']}/с)")
+    print(f"{'Запит':<24} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for name, summary in sorted(report["latency"].items()):
+        print(f"{name:<24} {summary['p50_ms']:>8.2f}мс {summary['p95_ms']:>8.2f}мс "
+              f"{summary['p99_ms']:>8.2f}мс {summary['max_ms']:>8.2f}мс")
+    lock_waits = report["lock_waits"]
+    print(f"Очікування блокувань: максимум {lock_waits['max_waiting']}, в середньому {lock_waits['mean_waiting']}, "
+          f"у {lock_waits['samples_with_waits']} з {lock_waits['samples']} вибірок")
+    print(f"Взаємні блокування: {report['errors'].get('deadlocks', 0)}, "
+          f"помилки серіалізації: {report['errors'].get('serialization_failures', 0)}")
+    other_errors = {name: count for name, count in report["errors"].items() if name not in RETRYABLE_ERRORS.values()}
+    if other_errors:
+        print(f"Інші помилки: {other_errors}")
+
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"\nЗвіт збережено у {output_path}")
+    return report
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    import sys
+
+    args = sys.argv[1:]
+    options: Dict[str, str] = {}
+    for name in ("--tx-size", "--isolation", "--mix", "--output"):
+        if name in args:
+            index = args.index(name)
+            if index + 1 >= len(args):
+                print(f"Помилка: Опція {name} потребує значення")
+                return
+            options[name] = args[index + 1]
+            del args[index:index + 2]
+
+    try:
+        workers = int(args[0]) if args else DEFAULT_WORKERS
+        duration = float(args[1]) if len(args) > 1 else DEFAULT_DURATION
+        ops_per_tx = int(options.get("--tx-size", "1"))
+        mix = None
+        if "--mix" in options:
+            mix = {int(number): int(weight) for number, weight
+                   in (item.split(":") for item in options["--mix"].split(","))}
+    except ValueError:
+        print("Використання:")
+        print("  python load_test.py [потоки] [секунди] [--tx-size N] [--isolation рівень] "
+              "[--mix 3:5,5:3,7:1,9:1] [--output звіт.json]")
+        return
+
+    if ops_per_tx < 1:
+        print("Помилка: Кількість запитів у транзакції (--tx-size) має бути додатною")
+        return
+    if mix is not None and any(weight <= 0 for weight in mix.values()):
+        print("Помилка: Частоти запитів у --mix мають бути додатними")
+        return
+
+    run_load_test(workers, duration, mix, ops_per_tx, options.get("--isolation", "read_committed"),
+                  output_path=options.get("--output"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Посторінковий перелік завдань з keyset-пагінацією
+
+Кожна сторінка продовжує з останнього показаного ID (WHERE t.id > ...
+ORDER BY t.id LIMIT ...), а не пропускає попередні рядки через OFFSET. Тому
+сторінка N коштує стільки ж, скільки перша, навіть на мільйонах завдань.
+Фільтри за користувачем і статусом обслуговують індекси (user_id, id) та
+(status_id, id), фільтр за доменом пошти - триграмний індекс users.email.
+"""
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from db import get_connection, release_connection
+from status_cache import get_status_id
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+TASKS_PAGE_SQL = """
+SELECT t.id, t.title, t.description, s.name as status, u.fullname as user_name, u.email
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+JOIN status s ON t.status_id = s.id
+WHERE {conditions}
+ORDER BY t.id
+LIMIT %(limit)s
+"""
+
+
+def encode_cursor(last_id: int, filters: Dict[str, Any]) -> str:
+    """Кодує позицію та фільтри сторінки у непрозорий рядок"""
+    payload = json.dumps({"after": last_id, "filters": filters}, sort_keys=True, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, filters: Dict[str, Any]) -> int:
+    """
+    Розкодовує курсор і повертає ID, після якого починається сторінка
+
+    Raises:
+        ValueError: якщо курсор пошкоджений або створений для інших фільтрів
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_id = int(payload["after"])
+        cursor_filters = payload["filters"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Некоректний курсор: {e}") from e
+
+    if cursor_filters != filters:
+        raise ValueError("Курсор створено для інших фільтрів")
+    return last_id
+
+
+def escape_like(value: str) -> str:
+    """Екранує спецсимволи LIKE, щоб домен порівнювався буквально"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def list_tasks(user_id: Optional[int] = None, status: Optional[str] = None,
+               email_domain: Optional[str] = None, cursor: Optional[str] = None,
+               limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[str], List[tuple], Optional[str]]:
+    """
+    Повертає одну сторінку завдань
+
+    Args:
+        user_id: Лише завдання цього користувача
+        status: Лише завдання з цим статусом
+        email_domain: Лише завдання користувачів з поштою в цьому домені
+        cursor: Курсор з попередньої сторінки (None - перша сторінка)
+        limit: Розмір сторінки (не більше MAX_PAGE_SIZE)
+
+    Returns:
+        (назви колонок, рядки сторінки, курсор наступної сторінки або None)
+
+    Raises:
+        ValueError: якщо курсор некоректний
+        KeyError: якщо статусу не існує
+        ConnectionError: якщо не вдалося підключитися до бази даних
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    filters: Dict[str, Any] = {"user_id": user_id, "status": status, "email_domain": email_domain}
+    after = decode_cursor(cursor, filters) if cursor else 0
+
+    # Беремо на один рядок більше, щоб дізнатися, чи є наступна сторінка
+    params: Dict[str, Any] = {"after": after, "limit": limit + 1}
+    conditions = ["t.id > %(after)s"]
+    if user_id is not None:
+        conditions.append("t.user_id = %(user_id)s")
+        params["user_id"] = user_id
+    if status is not None:
+        conditions.append("t.status_id = %(status_id)s")
+        params["status_id"] = get_status_id(status)
+    if email_domain is not None:
+        conditions.append("u.email LIKE %(email_pattern)s")
+        params["email_pattern"] = f"%@{escape_like(email_domain)}"
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    try:
+        with conn.cursor() as db_cursor:
+            db_cursor.execute(TASKS_PAGE_SQL.format(conditions=" AND ".join(conditions)), params)
+            columns = [desc[0] for desc in db_cursor.description]
+            rows = db_cursor.fetchall()
+    finally:
+        release_connection(conn)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0], filters)
+    return columns, rows, next_cursor
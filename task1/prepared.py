@@ -0,0 +1,265 @@
+"""
+Підготовлені параметризовані запити каталогу queries.sql
+
+Кожен запит каталогу має іменований аналог, у якому літерали замінено на
+параметри $1, $2, ... Запит готується на сервері через PREPARE один раз на
+з'єднання пулу, а далі виконується через EXECUTE без повторного розбору та
+планування. Значення за замовчуванням відтворюють літерали з queries.sql.
+
+Параметри-статуси приймають назву статусу, але на сервер надсилається його ID
+з кешу status_cache, тому підзапити (SELECT id FROM status WHERE name = ...)
+з каталогу тут не потрібні.
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from psycopg2.extensions import connection, cursor as Cursor
+from catalog import is_write_query
+from db import connection_state, get_connection, release_connection
+from pagination import escape_like
+from status_cache import get_status_id
+
+# Тип параметра, що приймає назву статусу: на сервер передається ID з кешу статусів,
+# тож запит не виконує підзапит до таблиці status
+STATUS_PARAM = "status"
+# Тип текстового параметра, який підставляється в шаблон LIKE: спецсимволи
+# екрануються, тож значення порівнюється буквально
+LIKE_PARAM = "like"
+
+
+class PreparedQuery(NamedTuple):
+    """Параметризований запит каталогу"""
+    number: int
+    name: str
+    sql: str
+    param_names: Tuple[str, ...] = ()
+    param_types: Tuple[str, ...] = ()
+    defaults: Tuple[Any, ...] = ()
+
+    @property
+    def is_write(self) -> bool:
+        return is_write_query(self.sql)
+
+
+PREPARED_QUERIES: List[PreparedQuery] = [
+    PreparedQuery(
+        1, "tasks_by_user",
+        """SELECT t.id, t.title, t.description, s.name as status, u.fullname as user_name
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+JOIN status s ON t.status_id = s.id
+WHERE t.user_id = $1""",
+        ("user_id",), ("integer",), (1,)),
+    PreparedQuery(
+        2, "tasks_by_status",
+        """SELECT t.id, t.title, t.description, u.fullname as user_name
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+WHERE t.status_id = $1""",
+        ("status",), (STATUS_PARAM,), ("new",)),
+    PreparedQuery(
+        3, "update_task_status",
+        """UPDATE tasks
+SET status_id = $2
+WHERE id = $1""",
+        ("task_id", "status"), ("integer", STATUS_PARAM), (1, "in progress")),
+    PreparedQuery(
+        4, "users_without_tasks",
+        """SELECT u.id, u.fullname, u.email
+FROM users u
+WHERE NOT EXISTS (SELECT 1 FROM tasks t WHERE t.user_id = u.id)"""),
+    PreparedQuery(
+        5, "add_task",
+        """INSERT INTO tasks (title, description, status_id, user_id)
+VALUES ($1, $2, $3, $4)""",
+        ("title", "description", "status", "user_id"), ("text", "text", STATUS_PARAM, "integer"),
+        ("Нове тестове завдання", "Опис нового завдання для тестування", "new", 1)),
+    PreparedQuery(
+        6, "unfinished_tasks",
+        """SELECT t.id, t.title, t.description, s.name as status, u.fullname as user_name
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+JOIN status s ON t.status_id = s.id
+WHERE t.status_id != $1""",
+        ("finished_status",), (STATUS_PARAM,), ("completed",)),
+    PreparedQuery(
+        7, "delete_task",
+        "DELETE FROM tasks WHERE id = $1",
+        ("task_id",), ("integer",), (1,)),
+    PreparedQuery(
+        8, "users_by_email",
+        """SELECT id, fullname, email
+FROM users
+WHERE email LIKE $1""",
+        ("email_pattern",), ("text",), ("%gmail%",)),
+    PreparedQuery(
+        9, "rename_user",
+        """UPDATE users
+SET fullname = $2
+WHERE id = $1""",
+        ("user_id", "fullname"), ("integer", "text"), (1, "Оновлене Ім'я Користувача")),
+    # Запити 10 та 14 читають лічильники, що підтримуються тригерами, замість
+    # агрегації всієї таблиці tasks
+    PreparedQuery(
+        10, "task_count_by_status",
+        """SELECT s.name as status_name, COALESCE(c.task_count, 0) as task_count
+FROM status s
+LEFT JOIN status_task_totals c ON c.status_id = s.id
+ORDER BY s.id"""),
+    PreparedQuery(
+        11, "tasks_by_email_domain",
+        """SELECT t.id, t.title, t.description, u.fullname, u.email, s.name as status
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+JOIN status s ON t.status_id = s.id
+WHERE u.email LIKE '%@' || $1 ESCAPE '\\'""",
+        ("domain",), (LIKE_PARAM,), ("example.com",)),
+    PreparedQuery(
+        12, "tasks_without_description",
+        """SELECT t.id, t.title, u.fullname as user_name, s.name as status
+FROM tasks t
+JOIN users u ON t.user_id = u.id
+JOIN status s ON t.status_id = s.id
+WHERE t.description IS NULL OR t.description = ''"""),
+    PreparedQuery(
+        13, "users_with_tasks_in_status",
+        """SELECT u.fullname, u.email, t.title, t.description
+FROM users u
+INNER JOIN tasks t ON u.id = t.user_id
+WHERE t.status_id = $1""",
+        ("status",), (STATUS_PARAM,), ("in progress",)),
+    PreparedQuery(
+        14, "task_count_by_user",
+        """SELECT u.id, u.fullname, u.email, COALESCE(c.task_count, 0) as task_count
+FROM users u
+LEFT JOIN user_task_totals c ON c.user_id = u.id
+ORDER BY task_count DESC, u.fullname"""),
+    PreparedQuery(
+        15, "search_tasks",
+        """SELECT t.id, t.title, t.description, ts_rank(t.search_vector, q) as rank
+FROM tasks t, websearch_to_tsquery('simple', $1) q
+WHERE t.search_vector @@ q
+ORDER BY rank DESC, t.id
+LIMIT $2""",
+        ("terms", "limit"), ("text", "integer"), ("тестове завдання", 20)),
+]
+
+_BY_NAME: Dict[str, PreparedQuery] = {query.name: query for query in PREPARED_QUERIES}
+_BY_NUMBER: Dict[int, PreparedQuery] = {query.number: query for query in PREPARED_QUERIES}
+
+
+def find_prepared_query(key: str) -> Optional[PreparedQuery]:
+    """Шукає запит за назвою або номером у каталозі"""
+    if key in _BY_NAME:
+        return _BY_NAME[key]
+    try:
+        return _BY_NUMBER.get(int(key))
+    except ValueError:
+        return None
+
+
+def resolve_status(value: Any, conn: Optional[connection] = None) -> int:
+    """
+    Перетворює назву статусу на ID; числові значення вважаються ID
+
+    Args:
+        value: Назва або ID статусу
+        conn: З'єднання, на якому перечитується застарілий кеш статусів
+    """
+    if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+        return int(value)
+    return get_status_id(value, conn)
+
+
+# Серверні типи параметрів, значення яких перетворюються на клієнті
+SERVER_TYPES = {STATUS_PARAM: "integer", LIKE_PARAM: "text"}
+
+
+def bind_value(value: Any, type_: str, conn: Optional[connection] = None) -> Any:
+    """Перетворює аргумент на значення, яке передається серверу для параметра типу type_"""
+    if type_ == STATUS_PARAM:
+        return resolve_status(value, conn)
+    if type_ == LIKE_PARAM:
+        return escape_like(str(value))
+    return value
+
+
+def ensure_prepared(conn: connection, cursor: Cursor, query: PreparedQuery) -> None:
+    """Готує запит на сервері, якщо на цьому з'єднанні його ще не готували"""
+    prepared: Set[str] = connection_state(conn).setdefault("prepared", set())
+    if query.name in prepared:
+        return
+
+    server_types = [SERVER_TYPES.get(type_, type_) for type_ in query.param_types]
+    types = f" ({', '.join(server_types)})" if server_types else ""
+    cursor.execute(f"PREPARE {query.name}{types} AS {query.sql}")
+    prepared.add(query.name)
+
+
+def execute_prepared(conn: connection, cursor: Cursor, query: PreparedQuery,
+                     args: Sequence[Any] = ()) -> None:
+    """
+    Виконує підготовлений запит на переданому курсорі
+
+    Args:
+        conn: З'єднання, якому належить курсор
+        cursor: Курсор для виконання
+        query: Запит каталогу
+        args: Аргументи; пропущені беруться зі значень за замовчуванням
+
+    Raises:
+        ValueError: якщо передано забагато аргументів
+    """
+    if len(args) > len(query.param_names):
+        raise ValueError(f"Запит {query.name} приймає {len(query.param_names)} аргументів, "
+                         f"передано {len(args)}")
+    values = tuple(
+        bind_value(value, type_, conn)
+        for value, type_ in zip(tuple(args) + query.defaults[len(args):], query.param_types)
+    )
+
+    ensure_prepared(conn, cursor, query)
+    if values:
+        placeholders = ", ".join(["%s"] * len(values))
+        cursor.execute(f"EXECUTE {query.name} ({placeholders})", values)
+    else:
+        cursor.execute(f"EXECUTE {query.name}")
+
+
+def run_prepared(key: str, *args: Any) -> Tuple[List[str], List[tuple], int]:
+    """
+    Виконує підготовлений запит каталогу на з'єднанні з пулу
+
+    Запити на зміну даних комітяться.
+
+    Args:
+        key: Назва запиту або його номер у queries.sql
+        *args: Аргументи запиту
+
+    Returns:
+        (назви колонок, рядки результату, кількість оброблених рядків)
+
+    Raises:
+        KeyError: якщо запит не знайдено
+        ConnectionError: якщо не вдалося підключитися до бази даних
+    """
+    query = find_prepared_query(str(key))
+    if query is None:
+        raise KeyError(f"Запит '{key}' не знайдено")
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    try:
+        with conn.cursor() as cursor:
+            execute_prepared(conn, cursor, query, args)
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            rows = cursor.fetchall() if cursor.description else []
+            rowcount = cursor.rowcount
+        if query.is_write:
+            conn.commit()
+        return columns, rows, rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_connection(conn)
@@ -1,71 +1,51 @@
 """
 Скрипт для виконання SQL запитів з файлу queries.sql
 """
-import psycopg2
-from typing import Optional, List, Tuple
-from psycopg2.extensions import connection
-import re
+from typing import List, Optional, TextIO
+import itertools
 import os
+import sys
+import time
+from catalog import CatalogQuery, load_catalog
+from db import get_connection, release_connection
+from export import export_query
+from instrumentation import OUTPUT_FORMATS, instrument_queries
+from pagination import DEFAULT_PAGE_SIZE, list_tasks
+from prepared import PREPARED_QUERIES, find_prepared_query, run_prepared
 
 
-def create_connection() -> Optional[connection]:
-    """Створює з'єднання з базою даних PostgreSQL"""
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="task_management",
-            user="postgres",
-            password="password",
-            port="5432"
-        )
-        return conn
-    except Exception as e:
-        print(f"Помилка підключення до бази даних: {e}")
-        return None
+# Скільки рядків за раз забирає з сервера іменований курсор у потоковому режимі
+DEFAULT_ITERSIZE = 2000
+
+_stream_cursor_ids = itertools.count(1)
 
+# Користувачі без жодного завдання. NOT EXISTS планується як anti-join по
+# індексу tasks(user_id, id) і масштабується лінійно, тоді як NOT IN (SELECT ...)
+# потребує хешу всіх user_id з tasks у work_mem, а без нього - перебору
+# підзапиту для кожного користувача. Запит береться з каталогу, а звіт лише
+# додає сталий порядок
+IDLE_USERS_QUERY_NUMBER = 4
 
-def parse_sql_file(file_path: str) -> List[Tuple[str, str]]:
-    """Парсить SQL файл і повертає список запитів з описами"""
+
+def parse_sql_file(file_path: str) -> List[CatalogQuery]:
+    """Повертає список запитів скомпільованого каталогу, вже класифікованих як читання чи зміна"""
     if not os.path.exists(file_path):
         print(f"Файл {file_path} не знайдено")
         return []
-    
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    
-    # Розділяємо по коментарях, що містять номери завдань
-    queries = []
-    
-    # Шукаємо блоки коментарів та SQL запитів
-    blocks = re.split(r'-- \d+\.', content)
-    
-    for i, block in enumerate(blocks):
-        if i == 0:  # Пропускаємо заголовок файлу
-            continue
-            
-        lines = block.strip().split('\n')
-        if not lines:
-            continue
-            
-        # Перший рядок - опис завдання
-        description = f"{i}. {lines[0].strip()}"
-        
-        # Решта рядків - SQL запит
-        sql_lines = []
-        for line in lines[1:]:
-            if line.strip() and not line.strip().startswith('--'):
-                sql_lines.append(line)
-        
-        if sql_lines:
-            sql_query = '\n'.join(sql_lines).strip()
-            if sql_query.endswith(';'):
-                sql_query = sql_query[:-1]  # Видаляємо крапку з комою
-            queries.append((description, sql_query))
-    
-    return queries
+    return load_catalog(file_path)
 
 
-def execute_query(cursor, query: str, description: str) -> None:
+def idle_users_sql(file_path: str = "queries.sql") -> Optional[str]:
+    """Повертає запит каталогу "користувачі без завдань" з сортуванням за ID або None, якщо його немає"""
+    for query in parse_sql_file(file_path):
+        if query.number == IDLE_USERS_QUERY_NUMBER:
+            return f"{query.sql}\nORDER BY u.id"
+    print(f"Запит {IDLE_USERS_QUERY_NUMBER} не знайдено у {file_path}")
+    return None
+
+
+def execute_query(cursor, query: str, description: str, itersize: int = DEFAULT_ITERSIZE,
+                  is_write: bool = False) -> None:
     """Виконує окремий SQL запит"""
     print(f"\n{'='*60}")
     print(f"{description}")
@@ -74,37 +54,72 @@ def execute_query(cursor, query: str, description: str) -> None:
     print(f"{'-'*60}")
     
     try:
-        cursor.execute(query)
-        
         # Для UPDATE, INSERT, DELETE запитів показуємо кількість змінених рядків
-        if query.strip().upper().startswith(('UPDATE', 'INSERT', 'DELETE')):
+        if is_write:
+            cursor.execute(query)
             print(f"Запит виконано. Змінено рядків: {cursor.rowcount}")
         else:
-            # Для SELECT запитів показуємо результати
-            results = cursor.fetchall()
-            if results:
-                # Отримуємо назви колонок
-                if cursor.description:
-                    column_names = [desc[0] for desc in cursor.description]
-                    print("Результати:")
-                    print(f"{'  |  '.join(column_names)}")
-                    print("-" * (len("  |  ".join(column_names)) + 10))
-                    
-                    for row in results:
-                        # Форматуємо None як 'NULL' для кращого відображення
-                        formatted_row = ['NULL' if item is None else str(item) for item in row]
-                        print(f"{'  |  '.join(formatted_row)}")
-                    print(f"\nЗнайдено записів: {len(results)}")
-                else:
-                    print("Результати отримано, але немає інформації про колонки")
-            else:
-                print("Результати: порожня множина")
+            # Для SELECT запитів потоково виводимо результати
+            stream_query_results(cursor.connection, query, itersize)
                 
     except Exception as e:
         print(f"Помилка виконання запиту: {e}")
 
 
-def execute_queries_from_file(sql_file_path: str = "queries.sql") -> None:
+def format_row(row: tuple) -> str:
+    """Форматує рядок результату, показуючи None як 'NULL'"""
+    return '  |  '.join('NULL' if item is None else str(item) for item in row)
+
+
+def stream_query_results(conn, query: str, itersize: int = DEFAULT_ITERSIZE,
+                         output: Optional[TextIO] = None) -> int:
+    """
+    Виконує SELECT через іменований серверний курсор і виводить рядки порціями
+
+    Сервер тримає результат у курсорі, а клієнт забирає по itersize рядків,
+    тому пам'ять клієнта не залежить від розміру результату.
+
+    Args:
+        conn: З'єднання з базою даних
+        query: SQL запит
+        itersize: Кількість рядків в одній порції
+        output: Куди писати рядки (за замовчуванням stdout)
+
+    Returns:
+        Кількість виведених рядків
+    """
+    output = output or sys.stdout
+    # Серверні курсори живуть у межах транзакції, тому імена мають бути унікальними
+    named_cursor = conn.cursor(name=f"stream_cursor_{next(_stream_cursor_ids)}")
+    named_cursor.itersize = itersize
+    try:
+        named_cursor.execute(query)
+        rows = named_cursor.fetchmany(itersize)
+        if not rows:
+            print("Результати: порожня множина")
+            return 0
+
+        # Назви колонок іменованого курсора доступні після першої вибірки
+        column_names = [desc[0] for desc in named_cursor.description]
+        header = '  |  '.join(column_names)
+        print("Результати:")
+        print(header)
+        print("-" * (len(header) + 10))
+
+        total = 0
+        while rows:
+            output.write('\n'.join(format_row(row) for row in rows) + '\n')
+            output.flush()
+            total += len(rows)
+            rows = named_cursor.fetchmany(itersize)
+
+        print(f"\nЗнайдено записів: {total}")
+        return total
+    finally:
+        named_cursor.close()
+
+
+def execute_queries_from_file(sql_file_path: str = "queries.sql", itersize: int = DEFAULT_ITERSIZE) -> None:
     """Виконує всі SQL запити з файлу"""
     
     # Парсимо SQL файл
@@ -115,7 +130,7 @@ def execute_queries_from_file(sql_file_path: str = "queries.sql") -> None:
         return
     
     # Підключаємось до бази даних
-    conn = create_connection()
+    conn = get_connection()
     if conn is None:
         print("Не вдалося підключитися до бази даних")
         return
@@ -127,11 +142,11 @@ def execute_queries_from_file(sql_file_path: str = "queries.sql") -> None:
         print("Виконання SQL запитів для системи управління завданнями")
         print("=" * 60)
         
-        for description, query in queries:
-            execute_query(cursor, query, description)
+        for query in queries:
+            execute_query(cursor, query.sql, query.description, itersize, query.is_write)
             
             # Для операцій зміни даних підтверджуємо транзакцію
-            if query.strip().upper().startswith(('UPDATE', 'INSERT', 'DELETE')):
+            if query.is_write:
                 conn.commit()
     
     except Exception as e:
@@ -140,10 +155,11 @@ def execute_queries_from_file(sql_file_path: str = "queries.sql") -> None:
     finally:
         if cursor:
             cursor.close()
-        conn.close()
+        release_connection(conn)
 
 
-def execute_single_query(query_number: int, sql_file_path: str = "queries.sql") -> None:
+def execute_single_query(query_number: int, sql_file_path: str = "queries.sql",
+                         itersize: int = DEFAULT_ITERSIZE) -> None:
     """Виконує один конкретний SQL запит за номером"""
     
     # Парсимо SQL файл
@@ -159,10 +175,10 @@ def execute_single_query(query_number: int, sql_file_path: str = "queries.sql")
         return
     
     # Отримуємо конкретний запит (індекс на 1 менше за номер)
-    description, query = queries[query_number - 1]
+    query = queries[query_number - 1]
     
     # Підключаємось до бази даних
-    conn = create_connection()
+    conn = get_connection()
     if conn is None:
         print("Не вдалося підключитися до бази даних")
         return
@@ -174,10 +190,10 @@ def execute_single_query(query_number: int, sql_file_path: str = "queries.sql")
         print(f"Виконання запиту #{query_number}")
         print("=" * 60)
         
-        execute_query(cursor, query, description)
+        execute_query(cursor, query.sql, query.description, itersize, query.is_write)
         
         # Для операцій зміни даних підтверджуємо транзакцію
-        if query.strip().upper().startswith(('UPDATE', 'INSERT', 'DELETE')):
+        if query.is_write:
             conn.commit()
     
     except Exception as e:
@@ -186,7 +202,54 @@ def execute_single_query(query_number: int, sql_file_path: str = "queries.sql")
     finally:
         if cursor:
             cursor.close()
-        conn.close()
+        release_connection(conn)
+
+
+def instrument_catalog(query_numbers: Optional[List[int]], output_format: str,
+                       stat_statements: bool = False, sql_file_path: str = "queries.sql") -> None:
+    """
+    Виконує запити каталогу в режимі вимірювання і виводить метрики замість результатів
+
+    Args:
+        query_numbers: Номери запитів (None - всі запити)
+        output_format: 'json' або 'prometheus'
+        stat_statements: Додати різниці лічильників pg_stat_statements
+        sql_file_path: Шлях до файлу з запитами
+    """
+    queries = parse_sql_file(sql_file_path)
+    if not queries:
+        print("Не знайдено запитів для виконання")
+        return
+
+    if query_numbers is not None:
+        unknown = [number for number in query_numbers if number < 1 or number > len(queries)]
+        if unknown:
+            print(f"Запит з номером {unknown[0]} не знайдено. Доступні запити: 1-{len(queries)}")
+            return
+        queries = [queries[number - 1] for number in query_numbers]
+
+    try:
+        instrument_queries(queries, output_format, stat_statements)
+    except Exception as e:
+        print(f"Помилка: {e}")
+
+
+def export_catalog_query(query_number: int, file_path: str, sql_file_path: str = "queries.sql") -> None:
+    """Експортує результат запиту каталогу за номером у CSV, Parquet або Arrow файл"""
+    queries = parse_sql_file(sql_file_path)
+    if not queries:
+        print("Не знайдено запитів для виконання")
+        return
+    if query_number < 1 or query_number > len(queries):
+        print(f"Запит з номером {query_number} не знайдено. Доступні запити: 1-{len(queries)}")
+        return
+
+    query = queries[query_number - 1]
+    print(f"Експорт: {query.description}")
+    try:
+        export_query(query, file_path)
+    except Exception as e:
+        print(f"Помилка експорту: {e}")
 
 
 def show_available_queries(sql_file_path: str = "queries.sql") -> None:
@@ -201,10 +264,11 @@ def show_available_queries(sql_file_path: str = "queries.sql") -> None:
     print("ДОСТУПНІ SQL ЗАПИТИ")
     print("="*80)
     
-    for i, (description, query) in enumerate(queries, 1):
-        print(f"\n{i}. {description.split('. ', 1)[1] if '. ' in description else description}")
+    for query in queries:
+        description = query.description
+        print(f"\n{query.number}. {description.split('. ', 1)[1] if '. ' in description else description}")
         # Показуємо перші кілька слів SQL запиту
-        query_preview = ' '.join(query.split()[:4]) + "..."
+        query_preview = ' '.join(query.sql.split()[:4]) + "..."
         print(f"   {query_preview}")
     
     print(f"\nДля виконання конкретного запиту використайте:")
@@ -214,32 +278,232 @@ def show_available_queries(sql_file_path: str = "queries.sql") -> None:
     print(f"python queries.py all")
 
 
+def show_idle_users(itersize: int = DEFAULT_ITERSIZE, sql_file_path: str = "queries.sql") -> None:
+    """Потоково виводить користувачів, які не мають жодного завдання"""
+    query = idle_users_sql(sql_file_path)
+    if query is None:
+        return
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return
+
+    try:
+        print("Користувачі без завдань")
+        print("=" * 60)
+        stream_query_results(conn, query, itersize)
+    except Exception as e:
+        print(f"Помилка виконання запиту: {e}")
+    finally:
+        release_connection(conn)
+
+
+def search_tasks(terms: str, limit: int = 20) -> None:
+    """Виконує ранжований повнотекстовий пошук завдань і виводить результат з часом виконання"""
+    started = time.perf_counter()
+    try:
+        columns, rows, _ = run_prepared("search_tasks", terms, limit)
+    except Exception as e:
+        print(f"Помилка виконання запиту: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if not rows:
+        print(f"Нічого не знайдено ({elapsed_ms:.1f} мс)")
+        return
+
+    header = '  |  '.join(columns)
+    print(header)
+    print("-" * (len(header) + 10))
+    for row in rows:
+        print(format_row(row))
+    print(f"\nЗнайдено записів: {len(rows)} за {elapsed_ms:.1f} мс")
+
+
+def show_prepared_queries() -> None:
+    """Показує список підготовлених параметризованих запитів"""
+    print("\n" + "="*80)
+    print("ПІДГОТОВЛЕНІ ПАРАМЕТРИЗОВАНІ ЗАПИТИ")
+    print("="*80)
+
+    for query in PREPARED_QUERIES:
+        params = ', '.join(f"{name} {type_} = {default!r}" for name, type_, default
+                           in zip(query.param_names, query.param_types, query.defaults))
+        print(f"{query.number:>3}. {query.name}({params})")
+
+    print("\nДля виконання використайте:")
+    print("python queries.py run <назва_або_номер> [аргументи...]")
+    print("Наприклад: python queries.py run tasks_by_user 5")
+
+
+def execute_prepared_query(key: str, args: List[str]) -> None:
+    """Виконує підготовлений запит з аргументами командного рядка і виводить результат"""
+    if find_prepared_query(key) is None:
+        print(f"Запит '{key}' не знайдено. Список запитів: python queries.py prepared")
+        return
+
+    try:
+        columns, rows, rowcount = run_prepared(key, *args)
+    except Exception as e:
+        print(f"Помилка виконання запиту: {e}")
+        return
+
+    if not columns:
+        print(f"Запит виконано. Змінено рядків: {rowcount}")
+    elif not rows:
+        print("Результати: порожня множина")
+    else:
+        header = '  |  '.join(columns)
+        print(header)
+        print("-" * (len(header) + 10))
+        for row in rows:
+            print(format_row(row))
+        print(f"\nЗнайдено записів: {len(rows)}")
+
+
+def show_tasks_page(args: List[str]) -> None:
+    """Виводить одну сторінку завдань з фільтрами з аргументів командного рядка"""
+    try:
+        user_id = pop_option(args, "--user")
+        status = pop_option(args, "--status")
+        email_domain = pop_option(args, "--domain")
+        cursor = pop_option(args, "--cursor")
+        limit = int(pop_option(args, "--limit", str(DEFAULT_PAGE_SIZE)))
+        if args:
+            raise ValueError(f"Невідомі аргументи: {' '.join(args)}")
+        columns, rows, next_cursor = list_tasks(
+            user_id=int(user_id) if user_id is not None else None,
+            status=status,
+            email_domain=email_domain,
+            cursor=cursor,
+            limit=limit,
+        )
+    except Exception as e:
+        print(f"Помилка: {e}")
+        return
+
+    if not rows:
+        print("Результати: порожня множина")
+        return
+
+    header = '  |  '.join(columns)
+    print(header)
+    print("-" * (len(header) + 10))
+    for row in rows:
+        print(format_row(row))
+
+    if next_cursor:
+        print(f"\nНаступна сторінка: --cursor {next_cursor}")
+    else:
+        print("\nЦе остання сторінка")
+
+
+def pop_option(args: List[str], name: str, default: Optional[str] = None) -> Optional[str]:
+    """Вилучає зі списку аргументів опцію виду '--name значення' і повертає значення"""
+    if name not in args:
+        return default
+    index = args.index(name)
+    if index + 1 >= len(args):
+        raise ValueError(f"Опція {name} потребує значення")
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+
+def print_usage() -> None:
+    """Виводить довідку з використання"""
+    print("Використання:")
+    print("  python queries.py                 - показати список запитів")
+    print("  python queries.py <номер_запиту>  - виконати конкретний запит")
+    print("  python queries.py all             - виконати всі запити")
+    print("  python queries.py prepared        - показати підготовлені параметризовані запити")
+    print("  python queries.py run <назва> [аргументи...] - виконати підготовлений запит")
+    print("  python queries.py idle-users      - користувачі без жодного завдання")
+    print("  python queries.py search <слова> [--limit N] - повнотекстовий пошук завдань")
+    print("  python queries.py export <номер_запиту> <файл.csv|.parquet|.arrow> - експорт результату через COPY")
+    print("  python queries.py tasks [--user ID] [--status S] [--domain D] [--limit N] [--cursor C]")
+    print("                                    - посторінковий перелік завдань")
+    print("  python queries.py --instrument json|prometheus [all | номер ...] [--stat-statements]")
+    print("                                    - метрики запитів (час, рядки, буфери) замість результатів")
+    print("Опції:")
+    print(f"  --itersize N  - кількість рядків в одній порції потокового виводу (за замовчуванням {DEFAULT_ITERSIZE})")
+
+
 def main():
     """Головна функція для обробки аргументів командного рядка"""
-    import sys
+    args = sys.argv[1:]
+    try:
+        itersize = int(pop_option(args, "--itersize", str(DEFAULT_ITERSIZE)))
+    except ValueError:
+        print("Помилка: --itersize має бути цілим числом")
+        return
+    if itersize < 1:
+        print("Помилка: --itersize має бути додатним")
+        return
+
+    try:
+        instrument_format = pop_option(args, "--instrument")
+    except ValueError:
+        print(f"Помилка: --instrument потребує формату: {', '.join(OUTPUT_FORMATS)}")
+        return
+    stat_statements = "--stat-statements" in args
+    if stat_statements:
+        args.remove("--stat-statements")
+    if instrument_format is not None:
+        if instrument_format not in OUTPUT_FORMATS:
+            print(f"Помилка: формат --instrument має бути одним з: {', '.join(OUTPUT_FORMATS)}")
+            return
+        try:
+            query_numbers = None if not args or args == ['all'] else [int(arg) for arg in args]
+        except ValueError:
+            print("Помилка: Номер запиту має бути цілим числом")
+            return
+        instrument_catalog(query_numbers, instrument_format, stat_statements)
+        return
     
-    if len(sys.argv) == 1:
+    if len(args) == 0:
         # Якщо аргументів немає - показуємо список запитів
         show_available_queries()
-    elif len(sys.argv) == 2:
-        arg = sys.argv[1]
+    elif args[0] == "prepared" and len(args) == 1:
+        show_prepared_queries()
+    elif args[0] == "run" and len(args) >= 2:
+        execute_prepared_query(args[1], args[2:])
+    elif args[0] == "search" and len(args) >= 2:
+        try:
+            limit = int(pop_option(args, "--limit", "20"))
+        except ValueError:
+            print("Помилка: --limit має бути цілим числом")
+            return
+        search_tasks(' '.join(args[1:]), limit)
+    elif args[0] == "idle-users" and len(args) == 1:
+        show_idle_users(itersize)
+    elif args[0] == "export" and len(args) == 3:
+        try:
+            query_number = int(args[1])
+        except ValueError:
+            print("Помилка: Номер запиту має бути цілим числом")
+            return
+        export_catalog_query(query_number, args[2])
+    elif args[0] == "tasks":
+        show_tasks_page(args[1:])
+    elif len(args) == 1:
+        arg = args[0]
         
         if arg.lower() in ['all', 'всі', 'все']:
             # Виконуємо всі запити
-            execute_queries_from_file()
+            execute_queries_from_file(itersize=itersize)
         else:
             try:
                 # Якщо є один аргумент - виконуємо конкретний запит
                 query_number = int(arg)
-                execute_single_query(query_number)
             except ValueError:
                 print("Помилка: Номер запиту має бути цілим числом")
                 print("Використання: python queries.py <номер_запиту>")
+                return
+            execute_single_query(query_number, itersize=itersize)
     else:
-        print("Використання:")
-        print("  python queries.py                 - показати список запитів")
-        print("  python queries.py <номер_запиту>  - виконати конкретний запит")
-        print("  python queries.py all             - виконати всі запити")
+        print_usage()
 
 
 if __name__ == "__main__":
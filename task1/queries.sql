@@ -21,7 +21,7 @@ WHERE id = 1;
 -- 4. Отримати список користувачів, які не мають жодного завдання
 SELECT u.id, u.fullname, u.email
 FROM users u
-WHERE u.id NOT IN (SELECT DISTINCT user_id FROM tasks WHERE user_id IS NOT NULL);
+WHERE NOT EXISTS (SELECT 1 FROM tasks t WHERE t.user_id = u.id);
 
 -- 5. Додати нове завдання для конкретного користувача
 INSERT INTO tasks (title, description, status_id, user_id)
@@ -86,3 +86,10 @@ FROM users u
 LEFT JOIN tasks t ON u.id = t.user_id
 GROUP BY u.id, u.fullname, u.email
 ORDER BY task_count DESC, u.fullname;
+
+-- 15. Повнотекстовий пошук завдань за назвою та описом з ранжуванням
+SELECT t.id, t.title, t.description, ts_rank(t.search_vector, q) as rank
+FROM tasks t, websearch_to_tsquery('simple', 'тестове завдання') q
+WHERE t.search_vector @@ q
+ORDER BY rank DESC, t.id
+LIMIT 20;
@@ -1,34 +1,90 @@
 """
 Скрипт для заповнення бази даних тестовими даними
 """
-import psycopg2
+import csv
+import io
+import os
 import random
-from typing import Optional, List, Tuple, Union
+import time
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Any, Dict, Optional, List, Tuple, Union, Iterable, Iterator
 from faker import Faker
-from psycopg2.extensions import connection
+from psycopg2.extensions import cursor as Cursor
+from create_tables import COMPACT_TASK_COUNTERS
+from db import get_connection, release_connection
+from status_cache import get_status_ids
 
 
-def create_connection() -> Optional[connection]:
-    """Створює з'єднання з базою даних PostgreSQL"""
-    try:
-        conn = psycopg2.connect(
-            host="localhost",
-            database="task_management",
-            user="postgres",
-            password="password",
-            port="5432"
-        )
-        return conn
-    except Exception as e:
-        print(f"Помилка підключення до бази даних: {e}")
-        return None
+# Кількість рядків, що відправляються одним COPY при масовому заповненні
+DEFAULT_CHUNK_SIZE = 50_000
+
+COPY_USERS_SQL = "COPY users (fullname, email) FROM STDIN WITH (FORMAT csv)"
+COPY_TASKS_SQL = "COPY tasks (title, description, status_id, user_id) FROM STDIN WITH (FORMAT csv)"
+
+# Базове зерно генератора; кожен шард отримує власне зерно DEFAULT_SEED + номер шарду,
+# а шарди завдань додатково зсуваються на TASK_SEED_OFFSET, щоб їхні потоки не
+# повторювали потоки шардів користувачів з тим самим номером
+DEFAULT_SEED = 42
+TASK_SEED_OFFSET = 10_000
+
+# Кількість рядків в одній контрольній точці інкрементального заповнення
+DEFAULT_CHECKPOINT_SIZE = 10_000
+
+# Запуски інкрементального заповнення та їхні закомічені порції. Порція
+# записується в seed_checkpoints у тій самій транзакції, що й її рядки, тож
+# після збою відомо, які порції вже в базі, і повторний запуск їх пропускає
+SEED_TABLES = """
+CREATE TABLE IF NOT EXISTS seed_runs (
+    run_id TEXT PRIMARY KEY,
+    seed INTEGER NOT NULL,
+    num_users INTEGER NOT NULL,
+    num_tasks INTEGER NOT NULL,
+    batch_size INTEGER NOT NULL,
+    user_row_base BIGINT NOT NULL,
+    task_user_min INTEGER,
+    task_user_max INTEGER,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    completed_at TIMESTAMPTZ
+);
+
+CREATE TABLE IF NOT EXISTS seed_checkpoints (
+    run_id TEXT NOT NULL REFERENCES seed_runs(run_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK (kind IN ('users', 'tasks')),
+    batch INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    committed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (run_id, kind, batch)
+);
+"""
+
+# Проміжна таблиця для завдань: ID користувачів з перерваних порцій могли
+# залишитись невикористаними, тож кожне завдання прив'язується до першого
+# існуючого користувача з ID не меншим за згенерований
+CREATE_TASKS_STAGE = """
+CREATE TEMP TABLE IF NOT EXISTS seed_tasks_stage (
+    title VARCHAR(100),
+    description TEXT,
+    status_id INTEGER,
+    user_id INTEGER
+) ON COMMIT DELETE ROWS;
+"""
+
+COPY_TASKS_STAGE_SQL = "COPY seed_tasks_stage (title, description, status_id, user_id) FROM STDIN WITH (FORMAT csv)"
+
+INSERT_STAGED_TASKS = """
+INSERT INTO tasks (title, description, status_id, user_id)
+SELECT s.title, s.description, s.status_id, u.id
+FROM seed_tasks_stage s
+CROSS JOIN LATERAL (SELECT id FROM users WHERE id >= s.user_id ORDER BY id LIMIT 1) u;
+"""
 
 
 def seed_database() -> None:
     """Заповнює таблиці випадковими даними"""
     fake = Faker(['uk_UA'])  # Українська локалізація
     
-    conn = create_connection()
+    conn = get_connection()
     if conn is None:
         print("Не вдалося підключитися до бази даних")
         return
@@ -37,10 +93,10 @@ def seed_database() -> None:
     try:
         cursor = conn.cursor()
         
-        # Очищуємо таблиці перед заповненням (у правильному порядку)
+        # TRUNCATE не видаляє рядки по одному і не запускає каскад для кожного
+        # користувача; RESTART IDENTITY починає ID знову з 1
         print("Очищення існуючих даних...")
-        cursor.execute("DELETE FROM tasks;")
-        cursor.execute("DELETE FROM users;")
+        cursor.execute("TRUNCATE tasks, users RESTART IDENTITY;")
         
         # Генеруємо та вставляємо користувачів
         print("Створення користувачів...")
@@ -60,8 +116,7 @@ def seed_database() -> None:
         user_ids: List[int] = [row[0] for row in cursor.fetchall()]
         
         # Отримуємо ID статусів
-        cursor.execute("SELECT id FROM status;")
-        status_ids: List[int] = [row[0] for row in cursor.fetchall()]
+        status_ids: List[int] = list(get_status_ids(conn).values())
         
         # Генеруємо та вставляємо завдання
         print("Створення завдань...")
@@ -77,18 +132,19 @@ def seed_database() -> None:
             "INSERT INTO tasks (title, description, status_id, user_id) VALUES (%s, %s, %s, %s);",
             tasks_data
         )
+        # Кожна вставка додала власні рядки-зміни лічильників
+        cursor.execute(COMPACT_TASK_COUNTERS)
         
         # Підтверджуємо зміни
         conn.commit()
         print(f"База даних успішно заповнена!")
         print(f"Створено {len(users_data)} користувачів та {len(tasks_data)} завдань")
         
-        # Показуємо статистику
+        # Показуємо статистику з лічильників, що підтримуються тригерами
         cursor.execute("""
-            SELECT s.name, COUNT(t.id) as task_count 
+            SELECT s.name, COALESCE(c.task_count, 0) as task_count 
             FROM status s 
-            LEFT JOIN tasks t ON s.id = t.status_id 
-            GROUP BY s.id, s.name 
+            LEFT JOIN status_task_totals c ON s.id = c.status_id
             ORDER BY s.id;
         """)
         print("\nСтатистика завдань за статусами:")
@@ -101,8 +157,533 @@ def seed_database() -> None:
     finally:
         if cursor:
             cursor.close()
-        conn.close()
+        release_connection(conn)
+
+
+def make_email(fake: Faker, row_number: int) -> str:
+    """
+    Генерує email, унікальність якого гарантує номер рядка
+
+    fake.unique.email() тримає в пам'яті всі видані значення і на мільйонах
+    рядків вичерпує варіанти, тому унікальність забезпечує суфікс з номером.
+    """
+    return f"{fake.user_name()}.{row_number}@{fake.free_email_domain()}"
+
+
+def generate_users(fake: Faker, start: int, count: int) -> Iterator[Tuple[str, str]]:
+    """Генерує count користувачів, нумеруючи їх починаючи зі start"""
+    for row_number in range(start, start + count):
+        yield fake.name(), make_email(fake, row_number)
+
+
+def generate_tasks(fake: Faker, count: int, status_ids: List[int],
+                   min_user_id: int, max_user_id: int,
+                   rng: Optional[random.Random] = None) -> Iterator[Tuple[str, Optional[str], int, int]]:
+    """Генерує count завдань для користувачів з діапазону ID [min_user_id, max_user_id]"""
+    rng = rng or random.Random()
+    for _ in range(count):
+        title = fake.sentence(nb_words=4).rstrip('.')
+        description: Optional[str] = fake.text(max_nb_chars=200) if rng.choice([True, False, True]) else None
+        yield title, description, rng.choice(status_ids), rng.randint(min_user_id, max_user_id)
+
+
+def copy_rows(cursor: Cursor, copy_sql: str, rows: Iterable[tuple],
+              chunk_size: int = DEFAULT_CHUNK_SIZE, label: str = "рядків") -> int:
+    """
+    Стрімить рядки у PostgreSQL через COPY ... FROM STDIN порціями
+
+    Args:
+        cursor: Курсор відкритого з'єднання
+        copy_sql: Команда COPY ... FROM STDIN у форматі CSV
+        rows: Ітератор рядків для вставки
+        chunk_size: Кількість рядків в одному COPY
+        label: Назва сутностей для звіту про прогрес
+
+    Returns:
+        Кількість вставлених рядків
+
+    Raises:
+        ValueError: якщо розмір порції менший за 1
+    """
+    # Без обмеження порції весь потік рядків накопичився б у пам'яті до одного COPY
+    if chunk_size < 1:
+        raise ValueError("Розмір порції має бути додатним")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    total = 0
+    in_chunk = 0
+    started = time.perf_counter()
+
+    def flush() -> None:
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        # None записується як порожнє поле без лапок, що COPY csv сприймає як NULL
+        writer.writerow(row)
+        in_chunk += 1
+        if in_chunk == chunk_size:
+            flush()
+            total += in_chunk
+            in_chunk = 0
+            elapsed = time.perf_counter() - started
+            print(f"  {total} {label} ({total / elapsed:,.0f} рядків/с)")
+
+    if in_chunk:
+        flush()
+        total += in_chunk
+
+    return total
+
+
+def bulk_seed(num_users: int, num_tasks: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """
+    Масово заповнює таблиці через COPY для навантажувального тестування
+
+    Args:
+        num_users: Кількість користувачів
+        num_tasks: Кількість завдань
+        chunk_size: Кількість рядків в одному COPY
+    """
+    fake = Faker(['uk_UA'])
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+
+        # TRUNCATE замість DELETE: не сканує таблиці і скидає лічильники ID,
+        # тож ID нових користувачів утворюють суцільний діапазон
+        print("Очищення існуючих даних...")
+        cursor.execute("TRUNCATE tasks, users RESTART IDENTITY;")
+        # Втрата останніх транзакцій при збої сервера для тестових даних не критична
+        cursor.execute("SET LOCAL synchronous_commit = off;")
+
+        print(f"Завантаження {num_users} користувачів...")
+        users_count = copy_rows(cursor, COPY_USERS_SQL, generate_users(fake, 1, num_users),
+                                chunk_size, "користувачів")
+
+        cursor.execute("SELECT MIN(id), MAX(id) FROM users;")
+        min_user_id, max_user_id = cursor.fetchone()
+
+        status_ids: List[int] = list(get_status_ids(conn).values())
+
+        print(f"Завантаження {num_tasks} завдань...")
+        tasks_count = 0
+        if users_count:
+            tasks_count = copy_rows(cursor, COPY_TASKS_SQL,
+                                    generate_tasks(fake, num_tasks, status_ids, min_user_id, max_user_id),
+                                    chunk_size, "завдань")
+
+        # Кожна порція COPY додала власні рядки-зміни лічильників
+        cursor.execute(COMPACT_TASK_COUNTERS)
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        total_rows = users_count + tasks_count
+        print(f"Створено {users_count} користувачів та {tasks_count} завдань за {elapsed:.1f} с "
+              f"({total_rows / elapsed:,.0f} рядків/с)")
+
+    except Exception as e:
+        print(f"Помилка при масовому заповненні бази даних: {e}")
+        conn.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+
+def split_into_shards(total: int, shards: int) -> List[Tuple[int, int]]:
+    """Ділить total рядків на shards частин, повертає пари (зміщення, кількість)"""
+    base, extra = divmod(total, shards)
+    result: List[Tuple[int, int]] = []
+    offset = 0
+    for index in range(shards):
+        count = base + (1 if index < extra else 0)
+        if count:
+            result.append((offset, count))
+        offset += count
+    return result
+
+
+def seed_shard(job: Tuple) -> Tuple[str, int, int, float]:
+    """
+    Генерує та завантажує один шард користувачів або завдань у процесі-воркері
+
+    Кожен шард має детерміноване зерно (seed + номер шарду, для завдань ще
+    + TASK_SEED_OFFSET), тож повторний запуск
+    з тими ж параметрами дає ті самі дані. Email-адреси користувачів нумеруються
+    глобальним зміщенням шарду, тому між воркерами вони не перетинаються.
+
+    Args:
+        job: (тип шарду 'users'/'tasks', номер шарду, зміщення, кількість, зерно,
+              розмір порції, ID статусів, мінімальний ID користувача, максимальний ID користувача)
+
+    Returns:
+        (тип шарду, номер шарду, кількість вставлених рядків, тривалість у секундах)
+    """
+    kind, shard_index, offset, count, seed, chunk_size, status_ids, min_user_id, max_user_id = job
+    fake = Faker(['uk_UA'])
+    shard_seed = seed + shard_index + (TASK_SEED_OFFSET if kind == "tasks" else 0)
+    fake.seed_instance(shard_seed)
+    rng = random.Random(shard_seed)
+
+    # Кожен воркер працює через власне з'єднання з пулу свого процесу
+    conn = get_connection()
+    if conn is None:
+        raise RuntimeError("Не вдалося підключитися до бази даних")
+
+    cursor = None
+    try:
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.execute("SET LOCAL synchronous_commit = off;")
+        if kind == "users":
+            inserted = copy_rows(cursor, COPY_USERS_SQL, generate_users(fake, offset + 1, count),
+                                 chunk_size, f"користувачів [шард {shard_index}]")
+        else:
+            inserted = copy_rows(cursor, COPY_TASKS_SQL,
+                                 generate_tasks(fake, count, status_ids, min_user_id, max_user_id, rng),
+                                 chunk_size, f"завдань [шард {shard_index}]")
+        conn.commit()
+        return kind, shard_index, inserted, time.perf_counter() - started
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+
+def run_shards(pool, kind: str, total: int, workers: int, seed: int, chunk_size: int,
+               status_ids: List[int], min_user_id: int = 0, max_user_id: int = 0) -> int:
+    """Розподіляє генерацію total рядків між воркерами пулу і повертає кількість вставлених"""
+    jobs = [
+        (kind, index, offset, count, seed, chunk_size, status_ids, min_user_id, max_user_id)
+        for index, (offset, count) in enumerate(split_into_shards(total, workers))
+    ]
+    inserted_total = 0
+    for _, shard_index, inserted, elapsed in pool.imap_unordered(seed_shard, jobs):
+        inserted_total += inserted
+        print(f"  Шард {shard_index}: {inserted} рядків за {elapsed:.1f} с ({inserted / elapsed:,.0f} рядків/с)")
+    return inserted_total
+
+
+def parallel_seed(num_users: int, num_tasks: int, workers: Optional[int] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, seed: int = DEFAULT_SEED) -> bool:
+    """
+    Масово заповнює таблиці, розподіляючи генерацію Faker між процесами
+
+    Args:
+        num_users: Кількість користувачів
+        num_tasks: Кількість завдань
+        workers: Кількість процесів (за замовчуванням - кількість ядер)
+        chunk_size: Кількість рядків в одному COPY
+        seed: Базове зерно генератора
+
+    Returns:
+        True якщо всі шарди завантажено успішно
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Перевіряємо до TRUNCATE, щоб помилка не залишила порожні таблиці
+    if workers < 1:
+        print("Помилка: Кількість процесів має бути додатною")
+        return False
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return False
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+
+        # Очищення комітиться одразу, щоб воркери бачили порожні таблиці
+        print("Очищення існуючих даних...")
+        cursor.execute("TRUNCATE tasks, users RESTART IDENTITY;")
+        conn.commit()
+
+        status_ids: List[int] = list(get_status_ids(conn).values())
+
+        with Pool(workers) as pool:
+            print(f"Завантаження {num_users} користувачів у {workers} процесах...")
+            users_count = run_shards(pool, "users", num_users, workers, seed, chunk_size, status_ids)
+
+            # Завдання залежать від ID користувачів, тому генеруються другим етапом
+            cursor.execute("SELECT MIN(id), MAX(id) FROM users;")
+            min_user_id, max_user_id = cursor.fetchone()
+
+            tasks_count = 0
+            if users_count:
+                print(f"Завантаження {num_tasks} завдань у {workers} процесах...")
+                tasks_count = run_shards(pool, "tasks", num_tasks, workers, seed, chunk_size,
+                                         status_ids, min_user_id, max_user_id)
+
+        # Згортаємо рядки-зміни, що залишили порції воркерів
+        cursor.execute(COMPACT_TASK_COUNTERS)
+        conn.commit()
+
+        elapsed = time.perf_counter() - started
+        total_rows = users_count + tasks_count
+        print(f"Створено {users_count} користувачів та {tasks_count} завдань за {elapsed:.1f} с "
+              f"({total_rows / elapsed:,.0f} рядків/с)")
+        return True
+
+    except Exception as e:
+        print(f"Помилка при паралельному заповненні бази даних: {e}")
+        conn.rollback()
+        return False
+    finally:
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+
+def find_or_create_run(cursor: Cursor, run_id: Optional[str], num_users: int, num_tasks: int,
+                       batch_size: int, seed: int) -> Dict[str, Any]:
+    """
+    Повертає незавершений запуск для продовження або створює новий
+
+    Без run_id продовжується останній незавершений запуск з тими самими
+    параметрами. Збережений запуск продовжується зі своїми параметрами.
+    """
+    columns = ("run_id", "seed", "num_users", "num_tasks", "batch_size",
+               "user_row_base", "task_user_min", "task_user_max", "completed_at")
+    select = f"SELECT {', '.join(columns)} FROM seed_runs"
+    if run_id is not None:
+        cursor.execute(f"{select} WHERE run_id = %s;", (run_id,))
+    else:
+        cursor.execute(f"""{select}
+            WHERE completed_at IS NULL AND num_users = %s AND num_tasks = %s
+              AND batch_size = %s AND seed = %s
+            ORDER BY started_at DESC LIMIT 1;""", (num_users, num_tasks, batch_size, seed))
+    row = cursor.fetchone()
+    if row:
+        return dict(zip(columns, row))
+
+    # Номери рядків для email нових користувачів починаються після найбільшого
+    # ID, тож не перетинаються з адресами попередніх запусків
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM users;")
+    user_row_base = cursor.fetchone()[0]
+    run_id = run_id or f"append_{datetime.now():%Y%m%d_%H%M%S}"
+    cursor.execute("""
+        INSERT INTO seed_runs (run_id, seed, num_users, num_tasks, batch_size, user_row_base)
+        VALUES (%s, %s, %s, %s, %s, %s);
+    """, (run_id, seed, num_users, num_tasks, batch_size, user_row_base))
+    return {"run_id": run_id, "seed": seed, "num_users": num_users, "num_tasks": num_tasks,
+            "batch_size": batch_size, "user_row_base": user_row_base,
+            "task_user_min": None, "task_user_max": None, "completed_at": None}
+
+
+def incremental_seed(num_users: int, num_tasks: int, batch_size: int = DEFAULT_CHECKPOINT_SIZE,
+                     run_id: Optional[str] = None, reset: bool = False, seed: int = DEFAULT_SEED) -> None:
+    """
+    Додає користувачів і завдання до наявних даних порціями з контрольними точками
+
+    Кожна порція комітиться разом із записом у seed_checkpoints, тож перерваний
+    запуск можна продовжити тією самою командою: закомічені порції
+    пропускаються, а решта генерується з тих самих зерен, що й у першій спробі.
+
+    Args:
+        num_users: Скільки користувачів додати
+        num_tasks: Скільки завдань додати
+        batch_size: Кількість рядків в одній порції (транзакції)
+        run_id: Ідентифікатор запуску (за замовчуванням продовжується останній
+                незавершений запуск з тими самими параметрами)
+        reset: Перед заповненням очистити таблиці через TRUNCATE ... RESTART IDENTITY
+        seed: Базове зерно генератора
+    """
+    # Перевіряємо до створення запису запуску, щоб не закомітити запуск, який не завершиться
+    if num_users < 0 or num_tasks < 0:
+        print("Помилка: Кількість рядків не може бути від'ємною")
+        return
+    if batch_size < 1:
+        print("Помилка: Розмір порції має бути додатним")
+        return
+
+    conn = get_connection()
+    if conn is None:
+        print("Не вдалося підключитися до бази даних")
+        return
+
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        cursor.execute(SEED_TABLES)
+        if reset:
+            print("Очищення існуючих даних...")
+            cursor.execute("TRUNCATE tasks, users, seed_checkpoints, seed_runs RESTART IDENTITY;")
+        run = find_or_create_run(cursor, run_id, num_users, num_tasks, batch_size, seed)
+        conn.commit()
+
+        if run["completed_at"] is not None:
+            print(f"Запуск {run['run_id']} вже завершено {run['completed_at']:%Y-%m-%d %H:%M:%S}")
+            return
+
+        cursor.execute("SELECT kind, batch FROM seed_checkpoints WHERE run_id = %s;", (run["run_id"],))
+        done = set(cursor.fetchall())
+        if done:
+            print(f"Продовження запуску {run['run_id']}: закомічено порцій {len(done)}")
+        else:
+            print(f"Запуск {run['run_id']}")
+
+        fake = Faker(['uk_UA'])
+        batch_size = run["batch_size"]
+        inserted = {"users": 0, "tasks": 0}
+
+        def apply_batch(kind: str, batch: int, load) -> None:
+            """Завантажує порцію і записує контрольну точку в одній транзакції"""
+            if (kind, batch) in done:
+                return
+            # Зерно залежить від запуску і номера порції, тож повтор порції дає ті самі дані
+            fake.seed_instance(f"{run['run_id']}:{run['seed']}:{kind}:{batch}")
+            rng = random.Random(f"{run['run_id']}:{run['seed']}:{kind}:{batch}")
+            cursor.execute("SET LOCAL synchronous_commit = off;")
+            rows = load(batch, rng)
+            cursor.execute("INSERT INTO seed_checkpoints (run_id, kind, batch, row_count) VALUES (%s, %s, %s, %s);",
+                           (run["run_id"], kind, batch, rows))
+            conn.commit()
+            inserted[kind] += rows
+            elapsed = time.perf_counter() - started
+            print(f"  {kind} порція {batch}: {rows} рядків "
+                  f"({(inserted['users'] + inserted['tasks']) / elapsed:,.0f} рядків/с)")
+
+        def load_users(batch: int, rng: random.Random) -> int:
+            offset = batch * batch_size
+            count = min(batch_size, run["num_users"] - offset)
+            return copy_rows(cursor, COPY_USERS_SQL,
+                             generate_users(fake, run["user_row_base"] + offset + 1, count),
+                             count, "користувачів")
+
+        user_batches = -(-run["num_users"] // batch_size)
+        for batch in range(user_batches):
+            apply_batch("users", batch, load_users)
+
+        if run["num_tasks"]:
+            # Діапазон користувачів фіксується один раз, щоб продовження генерувало ті самі завдання
+            if run["task_user_min"] is None:
+                cursor.execute("""
+                    UPDATE seed_runs SET (task_user_min, task_user_max) = (SELECT MIN(id), MAX(id) FROM users)
+                    WHERE run_id = %s
+                    RETURNING task_user_min, task_user_max;
+                """, (run["run_id"],))
+                run["task_user_min"], run["task_user_max"] = cursor.fetchone()
+                conn.commit()
+            if run["task_user_min"] is None:
+                print("Немає користувачів для завдань")
+                return
+
+            status_ids: List[int] = sorted(get_status_ids(conn).values())
+            cursor.execute(CREATE_TASKS_STAGE)
+            conn.commit()
+
+            def load_tasks(batch: int, rng: random.Random) -> int:
+                count = min(batch_size, run["num_tasks"] - batch * batch_size)
+                copy_rows(cursor, COPY_TASKS_STAGE_SQL,
+                          generate_tasks(fake, count, status_ids, run["task_user_min"], run["task_user_max"], rng),
+                          count, "завдань")
+                cursor.execute(INSERT_STAGED_TASKS)
+                return cursor.rowcount
+
+            task_batches = -(-run["num_tasks"] // batch_size)
+            for batch in range(task_batches):
+                apply_batch("tasks", batch, load_tasks)
+
+        # Згортаємо рядки-зміни лічильників, що залишили порції
+        cursor.execute(COMPACT_TASK_COUNTERS)
+        cursor.execute("UPDATE seed_runs SET completed_at = now() WHERE run_id = %s;", (run["run_id"],))
+        conn.commit()
+
+        elapsed = time.perf_counter() - started
+        print(f"Запуск {run['run_id']} завершено: додано {inserted['users']} користувачів та "
+              f"{inserted['tasks']} завдань за {elapsed:.1f} с")
+
+    except Exception as e:
+        print(f"Помилка при інкрементальному заповненні бази даних: {e}")
+        print("Закомічені порції збережено, повторіть команду, щоб продовжити")
+        conn.rollback()
+    finally:
+        if cursor:
+            cursor.close()
+        release_connection(conn)
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    import sys
+
+    if len(sys.argv) == 1:
+        seed_database()
+    elif sys.argv[1] == "bulk" and len(sys.argv) in (4, 5):
+        try:
+            num_users = int(sys.argv[2])
+            num_tasks = int(sys.argv[3])
+            chunk_size = int(sys.argv[4]) if len(sys.argv) == 5 else DEFAULT_CHUNK_SIZE
+        except ValueError:
+            print("Помилка: Кількість рядків має бути цілим числом")
+            return
+        if chunk_size < 1:
+            print("Помилка: Розмір порції має бути додатним")
+            return
+        bulk_seed(num_users, num_tasks, chunk_size)
+    elif sys.argv[1] == "parallel" and len(sys.argv) in (4, 5):
+        try:
+            num_users = int(sys.argv[2])
+            num_tasks = int(sys.argv[3])
+            workers = int(sys.argv[4]) if len(sys.argv) == 5 else None
+        except ValueError:
+            print("Помилка: Кількість рядків та процесів має бути цілим числом")
+            return
+        if workers is not None and workers < 1:
+            print("Помилка: Кількість процесів має бути додатною")
+            return
+        parallel_seed(num_users, num_tasks, workers)
+    elif sys.argv[1] == "append" and len(sys.argv) >= 4:
+        args = sys.argv[2:]
+        reset = "--reset" in args
+        if reset:
+            args.remove("--reset")
+        options: Dict[str, str] = {}
+        for name in ("--batch", "--run"):
+            if name in args:
+                index = args.index(name)
+                if index + 1 >= len(args):
+                    print(f"Помилка: Опція {name} потребує значення")
+                    return
+                options[name] = args[index + 1]
+                del args[index:index + 2]
+        try:
+            num_users, num_tasks = (int(arg) for arg in args)
+            batch_size = int(options.get("--batch", DEFAULT_CHECKPOINT_SIZE))
+        except ValueError:
+            print("Помилка: Кількість рядків та розмір порції мають бути цілими числами")
+            return
+        if num_users < 0 or num_tasks < 0:
+            print("Помилка: Кількість рядків не може бути від'ємною")
+            return
+        if batch_size < 1:
+            print("Помилка: Розмір порції має бути додатним")
+            return
+        incremental_seed(num_users, num_tasks, batch_size, options.get("--run"), reset)
+    else:
+        print("Використання:")
+        print("  python seed.py                                     - 10 користувачів та 30 завдань")
+        print("  python seed.py bulk <користувачі> <завдання> [порція] - масове заповнення через COPY")
+        print("  python seed.py parallel <користувачі> <завдання> [процеси] - паралельне масове заповнення")
+        print("  python seed.py append <користувачі> <завдання> [--batch N] [--run ID] [--reset]")
+        print("                                                     - додати рядки порціями з контрольними точками")
 
 
 if __name__ == "__main__":
-    seed_database()
+    main()
@@ -0,0 +1,185 @@
+"""
+Перевірки чистих функцій task1, які не потребують бази даних
+
+Запуск: python self_check.py (код виходу 1, якщо хоча б одна перевірка не пройшла)
+"""
+import contextlib
+import io
+import sys
+from typing import Callable, List, Tuple
+from catalog import is_write_query, parse_sql
+from export import COPY_CSV_CONVERT_OPTIONS, pa
+from pagination import decode_cursor, encode_cursor, escape_like
+from prepared import LIKE_PARAM, PREPARED_QUERIES, bind_value
+from seed import COPY_TASKS_SQL, copy_rows
+from transitions import BATCH_TRANSITION_SQL
+
+
+# Номери запитів queries.sql, що змінюють дані
+CATALOG_WRITE_QUERIES = {3, 5, 7, 9}
+
+
+def expect(condition: bool, message: str) -> None:
+    """Кидає AssertionError з поясненням, якщо умова хибна"""
+    if not condition:
+        raise AssertionError(message)
+
+
+def check_write_classification() -> None:
+    """is_write_query розпізнає зміни даних, зокрема всередині CTE"""
+    cases = [
+        ("SELECT 1", False),
+        ("-- коментар\n/* блок */ update tasks set status_id = 1", True),
+        ("TRUNCATE tasks", True),
+        ("WITH x AS (UPDATE tasks t SET status_id = 1 RETURNING t.id) SELECT * FROM x", True),
+        ("WITH x AS (UPDATE public.tasks SET status_id = 1 RETURNING id) SELECT * FROM x", True),
+        ('WITH x AS (DELETE FROM "tasks" RETURNING id) SELECT count(*) FROM x', True),
+        ("WITH x AS (SELECT 1) INSERT INTO status (name) SELECT 'new' FROM x", True),
+        ("WITH x AS (SELECT 'DELETE FROM tasks' AS s) SELECT * FROM x", False),
+        ("WITH x AS (SELECT $$UPDATE tasks SET$$ AS s) SELECT * FROM x -- insert into tasks", False),
+        ("WITH x AS (SELECT 'it''s' AS s /* update tasks set */) SELECT * FROM x", False),
+        ("WITH x AS (SELECT id FROM tasks FOR UPDATE OF tasks) SELECT * FROM x", False),
+        (BATCH_TRANSITION_SQL, True),
+    ]
+    for sql, expected in cases:
+        expect(is_write_query(sql) == expected, f"{sql.split()[:6]}: очікувалось {expected}")
+
+
+def check_catalog_parsing() -> None:
+    """parse_sql нумерує запити queries.sql і класифікує кожен один раз"""
+    with open("queries.sql", "r", encoding="utf-8") as file:
+        queries = parse_sql(file.read())
+    expect(len(queries) == 15, f"очікувалось 15 запитів, знайдено {len(queries)}")
+    expect([query.number for query in queries] == list(range(1, 16)), "номери запитів не послідовні")
+    writes = {query.number for query in queries if query.is_write}
+    expect(writes == CATALOG_WRITE_QUERIES, f"запити на зміну: {sorted(writes)}")
+    expect(all(not query.sql.endswith(';') for query in queries), "крапку з комою не видалено")
+
+
+
+def check_prepared_catalog() -> None:
+    """Підготовлені запити відповідають запитам queries.sql за номером і типом"""
+    with open("queries.sql", "r", encoding="utf-8") as file:
+        catalog = {query.number: query for query in parse_sql(file.read())}
+    numbers = [query.number for query in PREPARED_QUERIES]
+    expect(numbers == sorted(catalog), f"номери підготовлених запитів {numbers}")
+    names = [query.name for query in PREPARED_QUERIES]
+    expect(len(set(names)) == len(names), f"назви повторюються: {names}")
+    for query in PREPARED_QUERIES:
+        expect(query.is_write == catalog[query.number].is_write,
+               f"запит {query.number} ({query.name}): is_write = {query.is_write}")
+        expect(len(query.param_names) == len(query.param_types) == len(query.defaults),
+               f"запит {query.number} ({query.name}): параметри не узгоджені")
+
+
+def check_escape_like() -> None:
+    """escape_like екранує спецсимволи LIKE, щоб домен порівнювався буквально"""
+    cases = [
+        ("example.com", "example.com"),
+        ("my_domain.com", "my\\_domain.com"),
+        ("100%.ua", "100\\%.ua"),
+        ("back\\slash", "back\\\\slash"),
+    ]
+    for value, expected in cases:
+        expect(escape_like(value) == expected, f"escape_like({value!r}) = {escape_like(value)!r}")
+        expect(bind_value(value, LIKE_PARAM) == expected, f"параметр LIKE {value!r} не екрановано")
+
+
+def check_page_cursors() -> None:
+    """Курсор сторінки зберігає позицію і прив'язаний до своїх фільтрів"""
+    filters = {"user_id": 5, "status": "new", "email_domain": None}
+    cursor = encode_cursor(12345, filters)
+    expect("=" not in cursor, "курсор містить доповнення base64")
+    expect(decode_cursor(cursor, dict(filters)) == 12345, "курсор розкодовано неправильно")
+
+    for bad_cursor, bad_filters in [(cursor, {**filters, "status": "completed"}),
+                                    ("не-курсор", filters),
+                                    (encode_cursor(1, filters)[:-3], filters)]:
+        try:
+            decode_cursor(bad_cursor, bad_filters)
+        except ValueError:
+            continue
+        raise AssertionError(f"курсор {bad_cursor!r} прийнято для фільтрів {bad_filters}")
+
+
+class RecordingCursor:
+    """Курсор, що замість COPY запам'ятовує вміст кожної порції"""
+
+    def __init__(self) -> None:
+        self.chunks: List[str] = []
+
+    def copy_expert(self, sql: str, file: io.StringIO) -> None:
+        self.chunks.append(file.read())
+
+
+def check_copy_chunking() -> None:
+    """copy_rows відправляє рядки порціями не більше chunk_size і не втрачає залишок"""
+    rows = [(f"Завдання {i}", None if i % 2 else "опис, з комою", 1, i) for i in range(7)]
+    cursor = RecordingCursor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        total = copy_rows(cursor, COPY_TASKS_SQL, iter(rows), chunk_size=3)
+    expect(total == 7, f"вставлено {total} рядків замість 7")
+    sizes = [len(chunk.splitlines()) for chunk in cursor.chunks]
+    expect(sizes == [3, 3, 1], f"розміри порцій {sizes}")
+    expect(cursor.chunks[0].splitlines()[:2] == ['Завдання 0,"опис, з комою",1,0', 'Завдання 1,,1,1'],
+           "NULL або поле з комою записано неправильно")
+
+    for chunk_size in (0, -1):
+        try:
+            copy_rows(RecordingCursor(), COPY_TASKS_SQL, iter(rows), chunk_size=chunk_size)
+        except ValueError:
+            continue
+        raise AssertionError(f"chunk_size={chunk_size} прийнято")
+
+
+
+def check_arrow_null_values() -> None:
+    """Експорт в Arrow вважає NULL лише порожнє поле без лапок, а не рядки на кшталт NA чи null"""
+    expect(COPY_CSV_CONVERT_OPTIONS["null_values"] == [""],
+           f"null_values = {COPY_CSV_CONVERT_OPTIONS['null_values']!r}")
+    if pa is None:
+        return  # pyarrow не встановлено, розбір перевірити неможливо
+
+    import pyarrow.csv as pa_csv
+    data = 'name\nNA\nN/A\nNULL\nnull\nNaN\n""\n\n'.encode()
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        parse_options=pa_csv.ParseOptions(ignore_empty_lines=False),
+        convert_options=pa_csv.ConvertOptions(column_types={"name": pa.string()}, **COPY_CSV_CONVERT_OPTIONS),
+    )
+    values = table.column("name").to_pylist()
+    expect(values == ["NA", "N/A", "NULL", "null", "NaN", "", None], f"розібрано як {values}")
+
+
+CHECKS: List[Tuple[str, Callable[[], None]]] = [
+    ("Класифікація запитів читання/зміни", check_write_classification),
+    ("Розбір каталогу queries.sql", check_catalog_parsing),
+    ("Підготовлені запити відповідають каталогу", check_prepared_catalog),
+    ("Екранування LIKE", check_escape_like),
+    ("Курсори сторінок завдань", check_page_cursors),
+    ("Порції COPY при масовому заповненні", check_copy_chunking),
+    ("NULL при експорті в Arrow", check_arrow_null_values),
+]
+
+
+def run_checks() -> bool:
+    """Виконує всі перевірки і виводить підсумок; повертає True, якщо всі пройдено"""
+    results: List[str] = []
+    for name, check in CHECKS:
+        try:
+            check()
+            results.append(f"ПРОЙДЕНО  {name}")
+        except Exception as e:
+            results.append(f"ПОМИЛКА   {name}: {e}")
+
+    print("Перевірки task1")
+    print("=" * 60)
+    for result in results:
+        print(result)
+    passed = sum(1 for result in results if result.startswith("ПРОЙДЕНО"))
+    print(f"\nРезультат: {passed}/{len(results)} перевірок пройдено")
+    return passed == len(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_checks() else 1)
@@ -0,0 +1,161 @@
+"""
+Кеш ID статусів завдань у пам'яті процесу
+
+Таблиця status маленька і майже не змінюється, тому її вміст завантажується
+один раз. Тригер status_changed (create_tables.py) надсилає NOTIFY при будь-якій
+зміні таблиці; кеш слухає канал на окремому з'єднанні і перечитує статуси лише
+після сповіщення. Перевірка сповіщень не робить запитів до сервера - вона лише
+читає вже отримані дані з сокета.
+
+Якщо слухати канал не вдалося, кеш перечитується не частіше ніж раз на
+STATUS_CACHE_TTL секунд.
+
+Статуси перечитуються поза блокуванням кешу: потік, що тримає з'єднання з
+пулу, не чекає на інший потік, який сам чекає на вільне з'єднання.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import psycopg2
+from psycopg2.extensions import connection
+from db import get_connection, get_connection_params, release_connection
+
+
+STATUS_CHANNEL = "status_changed"
+STATUS_CACHE_TTL = float(os.getenv("STATUS_CACHE_TTL", "60"))
+
+_status_ids: Dict[str, int] = {}
+_loaded_at: Optional[float] = None
+# Кеш застарів і ще не перечитаний; покоління збільшується при кожному застаріванні,
+# щоб результат повільнішого перечитування не перезаписав новіший
+_reload_pending = False
+_generation = 0
+_listener: Optional[connection] = None
+_listener_pid: Optional[int] = None
+_inherited_listeners: List[connection] = []
+_lock = threading.Lock()
+
+
+def _open_listener() -> Optional[connection]:
+    """Відкриває окреме з'єднання, що слухає канал змін статусів"""
+    try:
+        listener = psycopg2.connect(**get_connection_params())
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {STATUS_CHANNEL};")
+        return listener
+    except psycopg2.Error as e:
+        print(f"Не вдалося підписатися на зміни статусів, кеш оновлюватиметься за TTL: {e}")
+        return None
+
+
+def _subscribe() -> None:
+    """(Пере)підписується на канал змін статусів у поточному процесі"""
+    global _listener, _listener_pid
+
+    if _listener is not None:
+        if _listener_pid != os.getpid():
+            # Сокет успадкованого після fork з'єднання належить батьківському процесу,
+            # закриття розірвало б його, тож лише тримаємо посилання
+            _inherited_listeners.append(_listener)
+        else:
+            _listener.close()
+    _listener = _open_listener()
+    _listener_pid = os.getpid()
+
+
+def _is_stale() -> bool:
+    """Перевіряє, чи потрібно перечитати статуси"""
+    # Сповіщення, що прийшли до підписки, втрачені - тому після (пере)підписки
+    # кеш завжди перечитується
+    if _loaded_at is None or _listener_pid != os.getpid():
+        _subscribe()
+        return True
+
+    if _listener is None or _listener.closed:
+        # Без підписки кеш живе STATUS_CACHE_TTL, після чого пробуємо підписатися знову
+        if time.monotonic() - _loaded_at <= STATUS_CACHE_TTL:
+            return False
+        _subscribe()
+        return True
+
+    try:
+        _listener.poll()
+    except psycopg2.Error:
+        _listener.close()
+        return True
+
+    if _listener.notifies:
+        _listener.notifies.clear()
+        return True
+    return False
+
+
+def _load(conn: Optional[connection]) -> Dict[str, int]:
+    """Читає статуси з бази даних; викликається без блокування кешу"""
+    own_conn = conn is None
+    if own_conn:
+        conn = get_connection()
+        if conn is None:
+            raise ConnectionError("Не вдалося підключитися до бази даних")
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name, id FROM status;")
+            return dict(cursor.fetchall())
+    finally:
+        if own_conn:
+            release_connection(conn)
+
+
+def get_status_ids(conn: Optional[connection] = None) -> Dict[str, int]:
+    """
+    Повертає відображення назва статусу -> ID
+
+    Args:
+        conn: З'єднання для завантаження, якщо кеш застарів
+              (за замовчуванням береться з пулу). Потоки, що вже тримають
+              з'єднання з пулу, мають передавати його сюди
+    """
+    global _status_ids, _loaded_at, _reload_pending, _generation
+
+    with _lock:
+        if not _reload_pending and _is_stale():
+            _reload_pending = True
+            _generation += 1
+        if not _reload_pending:
+            return dict(_status_ids)
+        generation = _generation
+
+    status_ids = _load(conn)
+
+    with _lock:
+        if generation == _generation:
+            _status_ids = status_ids
+            _loaded_at = time.monotonic()
+            _reload_pending = False
+    return dict(status_ids)
+
+
+def get_status_id(name: str, conn: Optional[connection] = None) -> int:
+    """
+    Повертає ID статусу за назвою
+
+    Raises:
+        KeyError: якщо статусу з такою назвою немає
+    """
+    status_ids = get_status_ids(conn)
+    if name not in status_ids:
+        raise KeyError(f"Статус '{name}' не знайдено")
+    return status_ids[name]
+
+
+def invalidate_status_cache() -> None:
+    """Примусово скидає кеш, наступне звернення перечитає статуси"""
+    global _status_ids, _loaded_at, _reload_pending, _generation
+
+    with _lock:
+        _status_ids = {}
+        _loaded_at = None
+        _reload_pending = False
+        _generation += 1
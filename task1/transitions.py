@@ -0,0 +1,151 @@
+"""
+Пакетна зміна статусів завдань
+
+Замість окремого UPDATE на кожне завдання (запит 3 з queries.sql) пари
+(ID завдання, новий статус) передаються масивами і застосовуються одним
+запитом UPDATE ... FROM unnest(...) на порцію.
+"""
+import csv
+import time
+from typing import Dict, Iterable, List, Tuple, Union
+from db import get_connection, release_connection
+from status_cache import get_status_ids
+
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# Результати для кожної пари
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+UNKNOWN_STATUS = "unknown_status"
+
+# Завдання, що вже мають потрібний статус, не перезаписуються (не створюють
+# зайвих версій рядків), але відрізняються у звіті від неіснуючих.
+# EXISTS бачить знімок до UPDATE, тож оновлені рядки теж вважаються існуючими
+BATCH_TRANSITION_SQL = """
+WITH requested AS (
+    SELECT * FROM unnest(%s::integer[], %s::integer[]) AS v(task_id, status_id)
+),
+updated AS (
+    UPDATE tasks t
+    SET status_id = requested.status_id
+    FROM requested
+    WHERE t.id = requested.task_id AND t.status_id <> requested.status_id
+    RETURNING t.id
+)
+SELECT requested.task_id,
+       CASE
+           WHEN updated.id IS NOT NULL THEN 'updated'
+           WHEN EXISTS (SELECT 1 FROM tasks WHERE id = requested.task_id) THEN 'unchanged'
+           ELSE 'not_found'
+       END
+FROM requested
+LEFT JOIN updated ON updated.id = requested.task_id
+"""
+
+
+def transition_tasks(transitions: Iterable[Tuple[int, Union[str, int]]],
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> List[Tuple[int, Union[str, int], str]]:
+    """
+    Застосовує пакет змін статусів в одній транзакції
+
+    Args:
+        transitions: Пари (ID завдання, назва або ID статусу). Якщо завдання
+                     зустрічається кілька разів, діє остання пара
+        batch_size: Кількість пар в одному UPDATE
+
+    Returns:
+        Список (ID завдання, статус, результат), де результат - одне з
+        'updated', 'unchanged', 'not_found', 'unknown_status'
+
+    Raises:
+        ConnectionError: якщо не вдалося підключитися до бази даних
+    """
+    started = time.perf_counter()
+    status_ids = get_status_ids()
+    known_ids = set(status_ids.values())
+
+    requested: Dict[int, Union[str, int]] = {}
+    for task_id, status in transitions:
+        requested[int(task_id)] = status
+
+    outcomes: Dict[int, str] = {}
+    pending: List[Tuple[int, int]] = []
+    for task_id, status in requested.items():
+        if isinstance(status, str) and status.isdigit():
+            status = int(status)
+        status_id = status if isinstance(status, int) else status_ids.get(status)
+        if status_id is None or status_id not in known_ids:
+            outcomes[task_id] = UNKNOWN_STATUS
+        else:
+            pending.append((task_id, status_id))
+
+    conn = get_connection()
+    if conn is None:
+        raise ConnectionError("Не вдалося підключитися до бази даних")
+
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                cursor.execute(BATCH_TRANSITION_SQL,
+                               ([task_id for task_id, _ in batch], [status_id for _, status_id in batch]))
+                outcomes.update(cursor.fetchall())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        release_connection(conn)
+
+    elapsed = time.perf_counter() - started
+    updated = sum(1 for outcome in outcomes.values() if outcome == UPDATED)
+    print(f"Оброблено {len(requested)} змін статусів за {elapsed:.3f} с "
+          f"({len(requested) / elapsed if elapsed else 0:,.0f} змін/с), оновлено {updated}")
+
+    return [(task_id, status, outcomes[task_id]) for task_id, status in requested.items()]
+
+
+def read_transitions_file(file_path: str) -> List[Tuple[int, str]]:
+    """Читає пари з CSV файлу з колонками task_id,status"""
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        return [(int(row[0]), row[1].strip()) for row in csv.reader(file) if row and row[0].strip().isdigit()]
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    import sys
+
+    args = sys.argv[1:]
+    try:
+        if len(args) == 2 and args[0] == "--file":
+            transitions = read_transitions_file(args[1])
+        elif args:
+            transitions = []
+            for arg in args:
+                task_id, status = arg.split(":", 1)
+                transitions.append((int(task_id), status))
+        else:
+            raise ValueError("не передано жодної зміни")
+    except (ValueError, OSError) as e:
+        print(f"Помилка: {e}")
+        print("Використання:")
+        print("  python transitions.py <id>:<статус> [<id>:<статус> ...]  - наприклад 1:completed '2:in progress'")
+        print("  python transitions.py --file <файл.csv>                  - CSV з колонками task_id,status")
+        return
+
+    try:
+        results = transition_tasks(transitions)
+    except Exception as e:
+        print(f"Помилка при зміні статусів: {e}")
+        return
+
+    # Для великих пакетів показуємо лише проблемні пари
+    for task_id, status, outcome in results:
+        if outcome != UPDATED or len(results) <= 50:
+            print(f"  {task_id}: {status} -> {outcome}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Асинхронні CRUD операції для колекції котів
+Використовує асинхронний API PyMongo (AsyncMongoClient) для роботи з базою даних cats_db
+
+На відміну від CatsDatabase, методи нічого не виводять, а повертають дані,
+тож один цикл подій може одночасно виконувати тисячі пошуків та оновлень.
+"""
+
+from typing import Optional, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import ASCENDING, AsyncMongoClient, ReturnDocument
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError
+from main import DEFAULT_CONNECTION_STRING, NAME_INDEX, CatsDatabase
+import asyncio
+import random
+import sys
+import time
+
+
+DEFAULT_BENCHMARK_CATS = 1000
+DEFAULT_BENCHMARK_OPERATIONS = 10_000
+DEFAULT_CONCURRENCY = 200
+BENCHMARK_PREFIX = "bench_cat_"
+
+
+class AsyncCatsDatabase:
+    """Асинхронний клас для управління базою даних котів з MongoDB"""
+
+    def __init__(self, connection_string: str = DEFAULT_CONNECTION_STRING):
+        """
+        Ініціалізація з'єднання з базою даних
+
+        Args:
+            connection_string: Рядок підключення до MongoDB
+        """
+        self.connection_string = connection_string
+        self.client: Optional[AsyncMongoClient] = None
+        self.collection: Optional[AsyncCollection] = None
+
+    async def connect(self) -> None:
+        """
+        Встановлення з'єднання з базою даних та створення індексів
+
+        Raises:
+            PyMongoError: якщо сервер недоступний
+        """
+        self.client = AsyncMongoClient(self.connection_string)
+        await self.client.admin.command('ping')
+        self.collection = self.client.cats_db.cats
+        await self.collection.create_index([("name", ASCENDING)], unique=True, name=NAME_INDEX)
+
+    async def disconnect(self) -> None:
+        """Закриття з'єднання з базою даних"""
+        if self.client:
+            await self.client.close()
+            self.client = None
+            self.collection = None
+
+    async def __aenter__(self) -> "AsyncCatsDatabase":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.disconnect()
+
+    def _require_collection(self) -> AsyncCollection:
+        if self.collection is None:
+            raise RuntimeError("Немає з'єднання з базою даних")
+        return self.collection
+
+    async def create_cat(self, name: str, age: int, features: List[str]) -> Optional[str]:
+        """
+        Створення нового кота (CREATE)
+
+        Returns:
+            ID нового документа або None, якщо кіт з таким іменем вже існує
+        """
+        try:
+            result = await self._require_collection().insert_one(
+                {"name": name, "age": age, "features": features})
+        except DuplicateKeyError:
+            return None
+        return str(result.inserted_id)
+
+    async def get_cat(self, name: str) -> Optional[Dict[str, Any]]:
+        """Пошук кота за іменем (READ); None, якщо кота не знайдено"""
+        return await self._require_collection().find_one({"name": name})
+
+    async def list_cats(self, limit: int = 0) -> List[Dict[str, Any]]:
+        """Повертає котів з колекції (READ); limit=0 - без обмеження"""
+        return await self._require_collection().find().limit(limit).to_list()
+
+    async def update_cat_age(self, name: str, new_age: int) -> bool:
+        """
+        Оновлення віку кота (UPDATE)
+
+        Returns:
+            True якщо кота знайдено (навіть якщо вік не змінився)
+        """
+        result = await self._require_collection().update_one({"name": name}, {"$set": {"age": new_age}})
+        return result.matched_count == 1
+
+    async def add_cat_feature(self, name: str, new_feature: str) -> Optional[Dict[str, Any]]:
+        """
+        Додавання характеристики коту (UPDATE)
+
+        Returns:
+            Оновлений документ або None, якщо кота не знайдено
+        """
+        return await self._require_collection().find_one_and_update(
+            {"name": name},
+            {"$addToSet": {"features": new_feature}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def delete_cat_by_name(self, name: str) -> bool:
+        """Видалення кота за іменем (DELETE); True, якщо кота видалено"""
+        result = await self._require_collection().delete_one({"name": name})
+        return result.deleted_count == 1
+
+    async def delete_all_cats(self) -> int:
+        """Видалення всіх котів (DELETE); повертає кількість видалених"""
+        result = await self._require_collection().delete_many({})
+        return result.deleted_count
+
+
+def benchmark_plan(num_cats: int, operations: int, seed: int = 42) -> List[tuple]:
+    """Однаковий для обох варіантів набір операцій: 80% пошуків і 20% оновлень віку"""
+    rng = random.Random(seed)
+    plan = []
+    for _ in range(operations):
+        name = f"{BENCHMARK_PREFIX}{rng.randrange(num_cats)}"
+        if rng.random() < 0.8:
+            plan.append(("get", name))
+        else:
+            plan.append(("update", name, rng.randint(0, 20)))
+    return plan
+
+
+def run_sync(cats_db: CatsDatabase, plan: List[tuple], threads: int = 1) -> float:
+    """Виконує план через колекцію синхронного CatsDatabase; повертає тривалість у секундах"""
+    collection = cats_db.collection
+
+    def execute(operation: tuple) -> None:
+        if operation[0] == "get":
+            collection.find_one({"name": operation[1]})
+        else:
+            collection.update_one({"name": operation[1]}, {"$set": {"age": operation[2]}})
+
+    started = time.perf_counter()
+    if threads == 1:
+        for operation in plan:
+            execute(operation)
+    else:
+        with ThreadPoolExecutor(threads) as executor:
+            list(executor.map(execute, plan))
+    return time.perf_counter() - started
+
+
+async def run_async(cats_db: AsyncCatsDatabase, plan: List[tuple], concurrency: int) -> float:
+    """Виконує план одночасно, не більше concurrency операцій водночас; повертає тривалість у секундах"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def execute(operation: tuple) -> None:
+        async with semaphore:
+            if operation[0] == "get":
+                await cats_db.get_cat(operation[1])
+            else:
+                await cats_db.update_cat_age(operation[1], operation[2])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(execute(operation) for operation in plan))
+    return time.perf_counter() - started
+
+
+async def run_benchmark(num_cats: int = DEFAULT_BENCHMARK_CATS, operations: int = DEFAULT_BENCHMARK_OPERATIONS,
+                        concurrency: int = DEFAULT_CONCURRENCY) -> None:
+    """
+    Порівнює синхронний CatsDatabase з AsyncCatsDatabase на однаковому наборі операцій
+
+    Тестові коти з префіксом bench_cat_ створюються перед вимірюванням і
+    видаляються після нього.
+    """
+    sync_db = CatsDatabase()
+    if not sync_db.connect():
+        return
+
+    try:
+        sync_db.collection.delete_many({"name": {"$regex": f"^{BENCHMARK_PREFIX}"}})
+        sync_db.bulk_import(({"name": f"{BENCHMARK_PREFIX}{i}", "age": i % 20, "features": ["тестовий"]}
+                             for i in range(num_cats)))
+        plan = benchmark_plan(num_cats, operations)
+
+        print(f"\n⏱️ {operations} операцій (80% пошуків, 20% оновлень) над {num_cats} котами")
+        print("=" * 60)
+        sequential = run_sync(sync_db, plan)
+        print(f"Синхронно, послідовно:            {sequential:>8.2f} с ({operations / sequential:>10,.0f} оп/с)")
+        threaded = run_sync(sync_db, plan, threads=min(concurrency, 64))
+        print(f"Синхронно, {min(concurrency, 64):>3} потоків:            {threaded:>8.2f} с "
+              f"({operations / threaded:>10,.0f} оп/с)")
+
+        async with AsyncCatsDatabase() as async_db:
+            concurrent = await run_async(async_db, plan, concurrency)
+        print(f"Асинхронно, до {concurrency:>4} одночасно:     {concurrent:>8.2f} с "
+              f"({operations / concurrent:>10,.0f} оп/с, x{sequential / concurrent:.1f})")
+        print("=" * 60)
+    finally:
+        sync_db.collection.delete_many({"name": {"$regex": f"^{BENCHMARK_PREFIX}"}})
+        sync_db.disconnect()
+
+
+def main() -> None:
+    """Головна функція для обробки аргументів командного рядка"""
+    try:
+        num_cats = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BENCHMARK_CATS
+        operations = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BENCHMARK_OPERATIONS
+        concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_CONCURRENCY
+    except ValueError:
+        print("Використання: python async_cats.py [коти] [операції] [одночасно]")
+        return
+
+    try:
+        asyncio.run(run_benchmark(num_cats, operations, concurrency))
+    except Exception as e:
+        print(f"❌ Помилка бенчмарку: {e}")
+
+
+if __name__ == "__main__":
+    main()
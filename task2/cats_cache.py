@@ -0,0 +1,135 @@
+"""
+In-process кеш документів котів з LRU-витісненням та TTL
+"""
+
+from typing import Optional, Dict, Any, Hashable
+from collections import OrderedDict
+import copy
+import threading
+import time
+
+
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_CACHE_TTL = 60.0
+
+
+class LRUTTLCache:
+    """
+    Кеш з обмеженою кількістю записів і часом життя кожного запису
+
+    Коли кеш заповнений, витісняється запис, до якого найдовше не звертались.
+    Запис, старший за ttl секунд, вважається відсутнім. Лічильники звернень
+    допомагають підібрати розмір і TTL під реальне навантаження.
+
+    Кеш безпечний для кількох потоків і для читання з джерела: мітка token(),
+    взята до читання, передається в set, і значення не зберігається, якщо ключ
+    за цей час скинули - інакше повільне читання повернуло б у кеш документ,
+    старший за паралельну зміну.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Args:
+            maxsize: Максимальна кількість записів
+            ttl: Час життя запису в секундах
+        """
+        if maxsize < 1:
+            raise ValueError("Розмір кешу має бути додатним")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Ключ -> (момент збереження, значення); порядок - від найдавніше використаного
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Лічильник скидань і момент останнього скидання кожного ключа; найстаріші
+        # моменти забуваються понад maxsize, а мітки, старші за забуте скидання
+        # (_floor), вважаються застарілими для будь-якого ключа
+        self._clock = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_writes = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Повертає копію значення з кешу або None, якщо запису немає чи він застарів"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Копія, щоб зміни документа викликачем не потрапили в кеш
+        return copy.deepcopy(value)
+
+    def token(self) -> int:
+        """Повертає мітку, яку потрібно взяти перед читанням значення з джерела"""
+        with self._lock:
+            return self._clock
+
+    def set(self, key: Hashable, value: Any, token: Optional[int] = None) -> None:
+        """
+        Зберігає значення, за потреби витісняючи найдавніше використаний запис
+
+        Args:
+            key: Ключ
+            value: Значення
+            token: Мітка token(), взята до читання значення; якщо після неї ключ
+                   скинули, значення застаріле і не зберігається
+        """
+        with self._lock:
+            if token is not None and (token < self._floor or self._invalidated.get(key, 0) > token):
+                self.stale_writes += 1
+                return
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Видаляє запис, якщо він є"""
+        with self._lock:
+            self._clock += 1
+            self._invalidated[key] = self._clock
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > self.maxsize:
+                _, stamp = self._invalidated.popitem(last=False)
+                self._floor = max(self._floor, stamp)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Видаляє всі записи; лічильники зберігаються"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._clock += 1
+            self._floor = self._clock
+            self._invalidated.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Повертає лічильники звернень і поточний розмір кешу"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_writes": self.stale_writes,
+            }
@@ -13,6 +13,9 @@ db.createUser({
     ]
 });
 
+// Унікальний індекс за іменем: швидкий пошук і захист від дублікатів на сервері
+db.cats.createIndex({ name: 1 }, { unique: true, name: 'cats_name_unique' });
+
 // Створюємо колекцію cats та вставляємо тестові дані
 db.cats.insertMany([
     {